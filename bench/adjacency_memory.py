@@ -0,0 +1,46 @@
+"""Compare the memory used by the edges of each connected component:
+the arrays of the CSR Adjacency kept by Graph, against the networkx copy
+of the same edges that Graph kept before, on data/*.lp.
+
+Adjacency memory is given by Adjacency.nbytes, networkx memory is
+the memory retained after building the networkx.Graph, measured with tracemalloc.
+
+usage:
+
+    python bench/adjacency_memory.py
+
+"""
+
+import os
+import sys
+import tracemalloc
+import networkx
+from common import REPO_DIR, data_files, print_table
+sys.path.insert(0, REPO_DIR)
+from powergrasp.graph import adjacencies_from_file
+
+
+def networkx_nbytes(adjacency) -> int:
+    """Memory retained by a networkx copy of given adjacency"""
+    edges = tuple(adjacency.edges())  # not measured: Graph got its edges from the file
+    tracemalloc.start()
+    graph = networkx.Graph(edges)
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del graph
+    return retained
+
+
+def run():
+    rows = []
+    for infile in data_files('*.lp'):
+        adjacencies = [adjacency for _, adjacency in adjacencies_from_file(infile)]
+        nx_kb = sum(map(networkx_nbytes, adjacencies)) / 2**10
+        adj_kb = sum(adjacency.nbytes() for adjacency in adjacencies) / 2**10
+        rows.append([os.path.basename(infile), sum(adjacency.nb_edge for adjacency in adjacencies),
+                     nx_kb, adj_kb, nx_kb / adj_kb if adj_kb else 0])
+    print_table(['file', 'edges', 'networkx (kB)', 'adjacency (kB)', 'ratio'], rows)
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,62 @@
+"""Compare the biclique lowerbounds with biclique lowerbound maxnei above 2:
+the exhaustive enumeration of the sets of nodes, and the greedy extension
+of Adjacency.greedy_biclique_score, on data/*.lp.
+
+For each file is given the best lowerbound over its connected components,
+with the time needed to compute them all.
+The exhaustive enumeration is not run on files having a cc
+of more than 150 nodes.
+
+usage:
+
+    python bench/biclique_lowerbound.py [maxnei]
+
+"""
+
+import os
+import sys
+import time
+import itertools
+from common import REPO_DIR, data_files, print_table
+sys.path.insert(0, REPO_DIR)
+from powergrasp.graph import adjacencies_from_file
+
+
+EXHAUSTIVE_LIMIT = 150  # nodes
+
+
+def exhaustive(adjacency, maxnei:int) -> int:
+    """Best score of level*shared neighbors, for levels 2 to maxnei, shared neighbors being at least 2"""
+    neis = {node: frozenset(adjacency.neighbors(node).tolist()) for node in range(adjacency.nb_node)}
+    best = 0
+    for level in range(2, maxnei + 1):
+        for sets in itertools.combinations(neis.keys(), r=level):
+            shared = len(frozenset.intersection(*(neis[s] for s in sets)))
+            if shared >= 2:
+                best = max(best, shared * level)
+    return best
+
+
+def run(maxnei:int=3):
+    rows = []
+    for infile in data_files('*.lp'):
+        adjacencies = [adjacency for _, adjacency in adjacencies_from_file(infile)]
+        start = time.perf_counter()
+        pairs = max((adjacency.max_common_neighbors() * 2 for adjacency in adjacencies), default=0)
+        pairs_time = time.perf_counter() - start
+        start = time.perf_counter()
+        greedy = max((adjacency.greedy_biclique_score(maxnei) for adjacency in adjacencies), default=0)
+        greedy_time = time.perf_counter() - start
+        if all(adjacency.nb_node <= EXHAUSTIVE_LIMIT for adjacency in adjacencies):
+            start = time.perf_counter()
+            best = max((exhaustive(adjacency, maxnei) for adjacency in adjacencies), default=0)
+            best_time = time.perf_counter() - start
+        else:
+            best, best_time = None, None
+        nb_node = max((adjacency.nb_node for adjacency in adjacencies), default=0)
+        rows.append([os.path.basename(infile), nb_node, pairs, pairs_time, best, best_time, greedy, greedy_time])
+    print_table(['file', 'biggest cc', 'pairs', 'pairs (s)', 'exhaustive', 'exhaustive (s)', 'greedy', 'greedy (s)'], rows)
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 3)
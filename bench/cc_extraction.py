@@ -0,0 +1,73 @@
+"""Compare the extraction of connected components through networkx
+with the union-find over the edges used by Graph.ccs_from_file,
+on data/*.lp and on a generated graph of given number of edges.
+
+Load time is the time to get the Graph of all connected components,
+peak memory is measured with tracemalloc.
+
+usage:
+
+    python bench/cc_extraction.py [nb generated edges]
+
+"""
+
+import os
+import sys
+import time
+import random
+import tempfile
+import tracemalloc
+from common import REPO_DIR, data_files, write_config, print_table
+
+
+def generated_file(workdir:str, nb_edge:int) -> str:
+    """Write a random graph made of connected components of about 1000 edges,
+    return its path"""
+    random.seed(nb_edge)
+    nb_node = nb_edge // 2
+    fname = os.path.join(workdir, 'generated-{}.lp'.format(nb_edge))
+    with open(fname, 'w') as fd:
+        for _ in range(nb_edge):
+            source = random.randrange(nb_node)
+            target = source // 500 * 500 + random.randrange(500)  # nodes of other blocks are not connected
+            fd.write('edge(n{},n{}).\n'.format(source, target))
+    return fname
+
+
+def measured(func:callable) -> (float, float):
+    """Return time (seconds) and peak memory (MB) needed to run given function.
+    Both are measured on separate runs, because tracemalloc slows down the run."""
+    start = time.perf_counter()
+    func()
+    duration = time.perf_counter() - start
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return duration, peak / 2**20
+
+
+def run(nb_edge:int=100000):
+    with tempfile.TemporaryDirectory() as workdir:
+        write_config(workdir, {})
+        os.chdir(workdir)  # powergrasp reads its config file at import
+        sys.path.insert(0, REPO_DIR)
+        import networkx
+        from powergrasp.graph import Graph, edges_from_file
+
+        def with_networkx(infile:str) -> [Graph]:
+            nxgraph = networkx.Graph(edges_from_file(infile))
+            return [Graph(nxgraph.subgraph(cc)) for cc in networkx.connected_components(nxgraph)]
+        def with_union_find(infile:str) -> [Graph]:
+            return list(Graph.ccs_from_file(infile))
+
+        rows = []
+        for infile in (*data_files('*.lp'), generated_file(workdir, nb_edge)):
+            nb_cc = len(with_union_find(infile))
+            (nx_time, nx_peak), (uf_time, uf_peak) = (measured(lambda: func(infile)) for func in (with_networkx, with_union_find))
+            rows.append([os.path.basename(infile), nb_cc, nx_time, uf_time, nx_peak, uf_peak])
+        print_table(['file', 'ccs', 'networkx (s)', 'union-find (s)', 'networkx (MB)', 'union-find (MB)'], rows)
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
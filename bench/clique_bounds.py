@@ -0,0 +1,50 @@
+"""Compare the clique upperbounds: the maximal clique allowed by the
+triangles of a node, counted on each neighborhood, and clique_upperbound,
+combining the core numbers and the triangles counted on oriented edges,
+on data/*.lp.
+
+For each file is given the best upperbound over its connected components,
+with the time needed to compute them all.
+
+usage:
+
+    python bench/clique_bounds.py
+
+"""
+
+import os
+import sys
+import time
+from common import REPO_DIR, data_files, print_table
+sys.path.insert(0, REPO_DIR)
+from powergrasp import utils
+from powergrasp.graph import adjacencies_from_file
+from powergrasp.searchers import clique_upperbound
+
+
+def by_neighborhoods(adjacency) -> int:
+    """Upperbound computed as CliqueSearcher did before core numbers"""
+    max_clique_size = max(utils.maximal_clique_size(adjacency.nb_edges_among(adjacency.neighbors(node)))
+                          for node in range(adjacency.nb_node))
+    return (max_clique_size * (max_clique_size - 1)) // 2
+
+
+def by_cores(adjacency) -> int:
+    return clique_upperbound(adjacency.core_numbers(), adjacency.triangles())
+
+
+def run():
+    rows = []
+    for infile in data_files('*.lp'):
+        adjacencies = [adjacency for _, adjacency in adjacencies_from_file(infile)]
+        row = [os.path.basename(infile), max((adjacency.nb_edge for adjacency in adjacencies), default=0)]
+        for bound in (by_neighborhoods, by_cores):
+            start = time.perf_counter()
+            row.append(max((bound(adjacency) for adjacency in adjacencies), default=0))
+            row.append(time.perf_counter() - start)
+        rows.append(row)
+    print_table(['file', 'biggest cc (edges)', 'neighborhoods', 'neighborhoods (s)', 'cores', 'cores (s)'], rows)
+
+
+if __name__ == '__main__':
+    run()
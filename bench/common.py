@@ -0,0 +1,72 @@
+"""Helpers shared by the benchmarks.
+
+Configuration of powergrasp is read at import time, so each compression
+is run in a dedicated process, in a temporary directory holding the
+config file for the tested options.
+
+"""
+
+import os
+import sys
+import glob
+import time
+import tempfile
+import subprocess
+
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(REPO_DIR, 'data')
+TIMEOUT = 120  # seconds allowed to a single compression
+BASE_CONFIG = {'SHOW_STORY': False, 'TEST_INTEGRITY': False}
+
+
+def data_files(pattern:str='*.lp') -> [str]:
+    """Return the sorted paths to data files matching given pattern"""
+    return sorted(fname for fname in glob.glob(os.path.join(DATA_DIR, pattern))
+                  if os.path.isfile(fname))  # ignore dangling links
+
+
+def compress_timed(infile:str, options:dict, repeat:int=1, timeout:float=TIMEOUT) -> float:
+    """Return the best wall time (in seconds) needed to compress given file
+    with given options, or None if the compression failed or timed out"""
+    times = []
+    with tempfile.TemporaryDirectory() as workdir:
+        write_config(workdir, options)
+        for _ in range(repeat):
+            start = time.perf_counter()
+            try:
+                proc = subprocess.run([sys.executable, '-m', 'powergrasp', infile, 'out.bbl'],
+                                      cwd=workdir, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                      env=dict(os.environ, PYTHONPATH=REPO_DIR), timeout=timeout)
+            except subprocess.TimeoutExpired:
+                print('TIMEOUT with {} after {}s'.format(os.path.basename(infile), timeout))
+                return None
+            if proc.returncode:
+                print('ERROR with {}: {}'.format(os.path.basename(infile), proc.stderr.decode().strip().splitlines()[-1:]))
+                return None
+            times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def write_config(workdir:str, options:dict):
+    """Write in given directory the config file for given options"""
+    with open(os.path.join(workdir, 'powergrasp.cfg'), 'w') as fd:
+        fd.write('[bench]\n')
+        for field, value in dict(BASE_CONFIG, **options).items():
+            fd.write('{} = {}\n'.format(field, value))
+
+
+def print_table(header:[str], rows:[[object]]):
+    """Print given rows as an aligned table"""
+    rows = [list(map(_cell, row)) for row in rows]
+    widths = [max(len(str(cell)) for cell in column) for column in zip(header, *rows)]
+    for row in (header, *rows):
+        print('  '.join(str(cell).ljust(width) for cell, width in zip(row, widths)))
+
+
+def _cell(value:object) -> str:
+    if value is None:
+        return '-'
+    if isinstance(value, float):
+        return '{:.3f}'.format(value)
+    return str(value)
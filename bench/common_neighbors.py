@@ -0,0 +1,54 @@
+"""Compare the computation of the maximal number of neighbors shared by
+two nodes, used by the biclique searchers lowerbounds: the pairwise
+intersection of neighbor sets, and Adjacency.max_common_neighbors.
+
+Graphs are random, with given numbers of nodes and an average degree of 10.
+The pairwise intersection is not run above 5000 nodes.
+
+usage:
+
+    python bench/common_neighbors.py [nb node]...
+
+"""
+
+import sys
+import time
+import random
+import itertools
+from common import REPO_DIR, print_table
+sys.path.insert(0, REPO_DIR)
+from powergrasp.adjacency import Adjacency
+
+
+PAIRWISE_LIMIT = 5000  # nodes
+
+
+def pairwise(adjacency:Adjacency) -> int:
+    neis = {node: frozenset(adjacency.neighbors(node).tolist()) for node in range(adjacency.nb_node)}
+    return max(len(neis[a] & neis[b]) for a, b in itertools.combinations(neis.keys(), r=2))
+
+
+def timed(func:callable, *args) -> (object, float):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def run(sizes:[int]):
+    rows = []
+    for nb_node in sizes:
+        random.seed(nb_node)
+        edges = {tuple(sorted((random.randrange(nb_node), random.randrange(nb_node)))) for _ in range(5 * nb_node)}
+        adjacency = Adjacency(nb_node, sorted(edges))
+        shared, shared_time = timed(adjacency.max_common_neighbors)
+        if nb_node <= PAIRWISE_LIMIT:
+            expected, pairwise_time = timed(pairwise, adjacency)
+            assert expected == shared, (expected, shared)
+        else:
+            pairwise_time = None
+        rows.append([nb_node, adjacency.nb_edge, shared, pairwise_time, shared_time])
+    print_table(['nodes', 'edges', 'max common', 'pairwise (s)', 'wedges (s)'], rows)
+
+
+if __name__ == '__main__':
+    run(list(map(int, sys.argv[1:])) or [1000, 5000, 30000, 100000])
@@ -0,0 +1,60 @@
+"""Compare the reading of clingo text output by clyngor's careful parsing
+with the reading of clingo JSON output, on the first multishot searches
+of the biggest connected component
+(up to MAX_EDGES edges) of data/*.lp.
+
+usage:
+
+    python bench/model_ingestion.py [repeat]
+
+"""
+
+import os
+import sys
+import time
+import tempfile
+from common import REPO_DIR, data_files, write_config, print_table
+
+
+MAX_EDGES = 500  # bigger connected components take too much time to solve
+
+def run(repeat:int=1):
+    with tempfile.TemporaryDirectory() as workdir:
+        write_config(workdir, {})
+        os.chdir(workdir)  # powergrasp reads its config file at import
+        sys.path.insert(0, REPO_DIR)
+        import clyngor
+        from powergrasp import asp
+        from powergrasp.graph import Graph
+        from powergrasp.searchers import BICLIQUE_ASP_FILES, STAR_ASP_FILES
+
+        rows, totals = [], [0., 0.]
+        for infile in data_files('*.lp'):
+            graphs = [graph for graph in Graph.ccs_from_file(infile) if graph.nb_edge <= MAX_EDGES]
+            if not graphs:
+                continue
+            for files in (BICLIQUE_ASP_FILES, STAR_ASP_FILES):
+                graph = max(graphs, key=lambda graph: graph.nb_edge)
+                atoms = ''.join(graph.as_asp(step=1))
+                constants = {'k': 1, 'lowerbound': 2, 'upperbound': graph.nb_edge}
+                def text():
+                    models = clyngor.solve(files, inline=atoms, constants=constants, stats=False, options='--opt-mode=optN')
+                    return list(models.by_predicate.careful_parsing.with_optimization)
+                def json():
+                    return list(asp._solve_in_subprocess(files, atoms, constants, '--opt-mode=optN'))
+                times = [min(_timed(func) for _ in range(repeat)) for func in (text, json)]
+                totals = [total + time for total, time in zip(totals, times)]
+                search = os.path.basename(files[0])[len('search-'):-len('.lp')]
+                rows.append([os.path.basename(infile), search, len(json()), *times, times[0] / times[1]])
+        rows.append(['TOTAL', '', '', *totals, totals[0] / totals[1]])
+        print_table(['file', 'search', 'models', 'text', 'json', 'speedup'], rows)
+
+
+def _timed(func:callable) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1)
@@ -0,0 +1,33 @@
+"""Compare the sequential and parallel motif searches on a few data files.
+
+usage:
+
+    python bench/parallel_search.py [repeat]
+
+"""
+
+import os
+import sys
+from common import DATA_DIR, compress_timed, print_table
+
+
+FILES = 'n8_d0.7.lp', 'structural-binding-maincc.lp', 'H10FW_vs_H10SW.lp'
+MODES = {'sequential': {'PARALLEL_MOTIF_SEARCH': False},
+         'parallel': {'PARALLEL_MOTIF_SEARCH': True}}
+BACKENDS = 'subprocess', 'module'
+
+
+def run(repeat:int=1):
+    rows = []
+    for backend in BACKENDS:
+        for fname in FILES:
+            infile = os.path.join(DATA_DIR, fname)
+            times = [compress_timed(infile, dict(options, CLINGO_BACKEND=backend), repeat=repeat)
+                     for options in MODES.values()]
+            ratio = times[1] / times[0] if all(times) else None
+            rows.append([fname, backend, *times, ratio])
+    print_table(['file', 'backend', *MODES, 'parallel/sequential'], rows)
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1)
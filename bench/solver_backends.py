@@ -0,0 +1,33 @@
+"""Compare the subprocess and in-process clingo backends on data/*.lp.
+
+usage:
+
+    python bench/solver_backends.py [repeat]
+
+"""
+
+import os
+import sys
+from common import data_files, compress_timed, print_table
+
+
+BACKENDS = 'subprocess', 'module'
+
+
+def run(repeat:int=1):
+    rows, totals = [], dict.fromkeys(BACKENDS, 0.)
+    for infile in data_files('*.lp'):
+        times = [compress_timed(infile, {'CLINGO_BACKEND': backend}, repeat=repeat)
+                 for backend in BACKENDS]
+        speedup = None
+        if all(times):  # totals only on files compressed by all backends
+            for backend, time in zip(BACKENDS, times):
+                totals[backend] += time
+            speedup = times[0] / times[1]
+        rows.append([os.path.basename(infile), *times, speedup])
+    rows.append(['TOTAL', *totals.values(), totals['subprocess'] / (totals['module'] or 1.)])
+    print_table(['file', *BACKENDS, 'speedup'], rows)
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1)
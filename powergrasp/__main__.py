@@ -3,19 +3,23 @@
 """
 
 from . import cli
+from . import binary
+from .graph import adjacencies_from_file
 from .routines import compress_by_cc
-from .constants import print_config
+from .constants import print_config, STREAMING_CHUNK_SIZE
 
 
 def run_cli():
     args = cli.parse_args(__doc__)
 
-    if args.show_config:
+    if args.command == 'convert':
+        binary.write(args.outfile, adjacencies_from_file(args.infile, STREAMING_CHUNK_SIZE))
+    elif args.show_config:
         print_config()
         exit()
     elif args.infile:
         with open(args.outfile, 'w') as fd:
-            for line in compress_by_cc(args.infile, args.recipe):
+            for line in compress_by_cc(args.infile, args.recipe, resume=args.resume):
                 fd.write(line + '\n')
     else:
         print('Nothing to do.')
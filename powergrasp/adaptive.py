@@ -0,0 +1,68 @@
+"""Choice of clingo options according to the solving times of previous searches.
+
+A SolveHistory is kept for each searcher name during the whole run,
+so that the options learned on a connected component
+are used for the next ones compressed in the same process.
+
+"""
+
+
+class SolveHistory:
+    """Solving times of the searches made with each candidate options.
+
+    Searches are made on graphs of different sizes, the first ones on whole
+    connected components, the next ones on what remains to compress.
+    Times are therefore compared per edge of the searched graph.
+
+    Each candidate is first used until one of its searches is recorded,
+    in given order. Then the candidate of lowest mean time per edge is used.
+
+    >>> history = SolveHistory(['--opt-strategy=bb', '--opt-strategy=usc'])
+    >>> history.choose()
+    '--opt-strategy=bb'
+    >>> history.record('--opt-strategy=bb', 2., nb_edge=100)
+    >>> history.choose()
+    '--opt-strategy=usc'
+    >>> history.record('--opt-strategy=usc', 1., nb_edge=25)  # faster, but slower per edge
+    >>> history.choose()
+    '--opt-strategy=bb'
+    >>> history.record('--opt-strategy=bb', 8., nb_edge=100)
+    >>> history.choose()
+    '--opt-strategy=usc'
+    >>> history.mean_time('--opt-strategy=bb')
+    0.05
+
+    """
+
+    def __init__(self, candidates:[str]):
+        self.candidates = tuple(candidates)
+        self._total_time = dict.fromkeys(self.candidates, 0.)  # sum of times per edge
+        self._nb_search = dict.fromkeys(self.candidates, 0)
+
+    def choose(self) -> str:
+        """Return the candidate options to use for the next search"""
+        untried = next((options for options in self.candidates if not self._nb_search[options]), None)
+        if untried is not None:
+            return untried
+        return min(self.candidates, key=self.mean_time)
+
+    def record(self, options:str, time:float, nb_edge:int):
+        """Remember that a search made with given options on a graph
+        of given number of edges took given time"""
+        self._total_time[options] += time / max(1, nb_edge)
+        self._nb_search[options] += 1
+
+    def mean_time(self, options:str) -> float:
+        """Mean solving time per edge of given candidate options"""
+        return self._total_time[options] / self._nb_search[options]
+
+
+_HISTORIES = {}  # searcher name -> SolveHistory
+
+
+def history_for(name:str, candidates:[str]) -> SolveHistory:
+    """Return the SolveHistory of given searcher name, shared by all its
+    searchers in the current process"""
+    if name not in _HISTORIES:
+        _HISTORIES[name] = SolveHistory(candidates)
+    return _HISTORIES[name]
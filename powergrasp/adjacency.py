@@ -0,0 +1,371 @@
+"""Compact adjacency of a graph, stored as numpy arrays in CSR layout.
+
+Nodes are the integers 0..n-1 given by Graph.
+Each edge appears twice, once in the row of each of its nodes,
+rows being sorted so that an edge is found by binary search.
+Removing an edge only unsets its two entries in the alive mask:
+arrays are never reallocated during the compression.
+
+"""
+
+import time
+import itertools
+import numpy
+
+
+class Adjacency:
+    """Edges between nodes 0..nb_node-1 of an undirected graph.
+
+    >>> adj = Adjacency(5, [(0, 1), (1, 2), (2, 0), (2, 3)])
+    >>> adj.nb_edge, adj.degrees.tolist()
+    (4, [2, 2, 3, 1, 0])
+    >>> adj.neighbors(2).tolist()
+    [0, 1, 3]
+    >>> adj.triangles().tolist()
+    [1, 1, 1, 0, 0]
+    >>> adj.remove_edges([(2, 0), (3, 4)])
+    1
+    >>> list(adj.edges())
+    [(0, 1), (1, 2), (2, 3)]
+    >>> adj.degrees.tolist(), adj.nb_edge
+    ([1, 2, 2, 1, 0], 3)
+    >>> (0, 2) in adj, (2, 1) in adj
+    (False, True)
+
+    """
+
+    def __init__(self, nb_node:int, edges:iter):
+        pairs = numpy.array([edge for edge in edges if edge[0] != edge[1]], dtype=numpy.int32).reshape(-1, 2)
+        sources = numpy.concatenate((pairs[:, 0], pairs[:, 1]))
+        targets = numpy.concatenate((pairs[:, 1], pairs[:, 0]))
+        indptr = numpy.zeros(nb_node + 1, dtype=numpy.int64)
+        numpy.cumsum(numpy.bincount(sources, minlength=nb_node), out=indptr[1:])
+        self._setup(indptr, targets[numpy.lexsort((targets, sources))])
+
+    @staticmethod
+    def from_csr(indptr:numpy.ndarray, indices:numpy.ndarray, mapping:tuple=None) -> 'Adjacency':
+        """Return the adjacency of given CSR layout, each edge appearing
+        in the rows of its two nodes, and rows being sorted.
+        The indices are not copied, and may be a read-only memory map.
+
+        mapping -- (filename, offset) of the indices, if mapped from a file.
+                   The pickled adjacency will then map it again,
+                   so that processes share the pages of the file.
+
+        >>> adj = Adjacency.from_csr(numpy.array([0, 1, 3, 4]), numpy.array([1, 0, 2, 1], dtype=numpy.int32))
+        >>> list(adj.edges()), adj.degrees.tolist()
+        ([(0, 1), (1, 2)], [1, 2, 1])
+
+        """
+        adjacency = Adjacency.__new__(Adjacency)
+        adjacency._setup(indptr, indices, mapping)
+        return adjacency
+
+    def _setup(self, indptr:numpy.ndarray, indices:numpy.ndarray, mapping:tuple=None):
+        self._indices = indices  # neighbors, row after row
+        self._indptr = indptr  # node -> start of its row
+        self._mapping = mapping  # (filename, offset) of the indices, if mapped
+        nb_node = len(indptr) - 1
+        self._alive = numpy.ones(len(self._indices), dtype=bool)  # False for removed edges
+        self._degrees = numpy.diff(self._indptr).astype(numpy.int32)
+        self._marks = numpy.zeros(nb_node, dtype=bool)  # scratch space of nb_edges_among
+        self.nb_edge = len(self._indices) // 2
+
+    def __getstate__(self) -> dict:
+        state = dict(self.__dict__)
+        if self._mapping:  # will be mapped again
+            state['_indices'] = len(self._indices)
+        return state
+
+    def __setstate__(self, state:dict):
+        self.__dict__.update(state)
+        if self._mapping:
+            filename, offset = self._mapping
+            self._indices = numpy.memmap(filename, dtype=numpy.int32, mode='r', offset=offset, shape=(state['_indices'],))
+
+    def csr(self) -> (numpy.ndarray, numpy.ndarray):
+        """Arrays indptr and indices of the CSR layout, removed edges included"""
+        return self._indptr, self._indices
+
+    @property
+    def nb_node(self) -> int:
+        return len(self._degrees)
+
+    @property
+    def degrees(self) -> numpy.ndarray:
+        """Read-only array node -> number of remaining neighbors"""
+        degrees = self._degrees.view()
+        degrees.flags.writeable = False
+        return degrees
+
+    def _position(self, source:int, target:int) -> int or None:
+        """Index of target in the row of source, or None if not an edge"""
+        start, stop = self._indptr[source], self._indptr[source + 1]
+        idx = start + numpy.searchsorted(self._indices[start:stop], target)
+        if idx < stop and self._indices[idx] == target and self._alive[idx]:
+            return idx
+        return None
+
+    def __contains__(self, edge:(int, int)) -> bool:
+        return self._position(*edge) is not None
+
+    def neighbors(self, node:int) -> numpy.ndarray:
+        """Array of the remaining neighbors of given node, in increasing order"""
+        start, stop = self._indptr[node], self._indptr[node + 1]
+        return self._indices[start:stop][self._alive[start:stop]]
+
+    def _sources(self) -> numpy.ndarray:
+        """Array giving the source node of each position in the layout"""
+        return numpy.repeat(numpy.arange(self.nb_node, dtype=numpy.int32), numpy.diff(self._indptr))
+
+    def edge_positions(self) -> numpy.ndarray:
+        """Positions in the layout of the remaining edges, with source < target.
+        Masks returned by edge filters are aligned with them."""
+        return numpy.flatnonzero(self._alive & (self._sources() < self._indices))
+
+    def edge_array(self) -> (numpy.ndarray, numpy.ndarray):
+        """Arrays of sources and targets of remaining edges, with source < target"""
+        positions = self.edge_positions()
+        return self._sources()[positions], self._indices[positions]
+
+    def edge_labels(self, label:callable) -> numpy.ndarray:
+        """Return an object array holding label(source, target) for each edge
+        at its position in the layout, to be indexed by edge_positions()
+
+        >>> adj = Adjacency(3, [(0, 1), (2, 1)])
+        >>> labels = adj.edge_labels('{}-{}'.format)
+        >>> labels[adj.edge_positions()].tolist()
+        ['0-1', '1-2']
+        >>> adj.remove_edges([(0, 1)])
+        1
+        >>> labels[adj.edge_positions()].tolist()
+        ['1-2']
+
+        """
+        labels = numpy.empty(len(self._indices), dtype=object)
+        positions = self.edge_positions()
+        sources, targets = self._sources()[positions], self._indices[positions]
+        labels[positions] = [label(source, target) for source, target in zip(sources.tolist(), targets.tolist())]
+        return labels
+
+    def edges(self) -> iter:
+        """Yield remaining edges as pairs (source, target) of ints, with source < target"""
+        sources, targets = self.edge_array()
+        yield from zip(sources.tolist(), targets.tolist())
+
+    def pack(self, edges:iter) -> numpy.ndarray:
+        """Sorted array of the distinct given edges, each packed in one integer
+        as min(u, v) * nb_node + max(u, v)
+
+        >>> Adjacency(4, []).pack([(3, 1), (1, 3), (0, 2)]).tolist()
+        [2, 7]
+
+        """
+        pairs = numpy.array(edges if isinstance(edges, numpy.ndarray) else tuple(edges), dtype=numpy.int64).reshape(-1, 2)
+        return numpy.unique(pairs.min(axis=1) * self.nb_node + pairs.max(axis=1))
+
+    def edge_keys(self) -> numpy.ndarray:
+        """Sorted array of the remaining edges, packed as in pack"""
+        sources, targets = self.edge_array()
+        return sources.astype(numpy.int64) * self.nb_node + targets
+
+    def unpack(self, keys:numpy.ndarray) -> [(int, int)]:
+        """Return the edges packed in given keys, as pairs of ints"""
+        return list(zip(*(part.tolist() for part in divmod(keys, self.nb_node))))
+
+    def remove_keys(self, keys:numpy.ndarray) -> int:
+        """Remove the edges of given distinct packed keys (see pack),
+        return the number of them that were in the graph.
+
+        Rows being sorted, the layout is sorted by packed keys,
+        so all edges are found at once by binary search.
+
+        """
+        if not len(keys) or not len(self._indices):
+            return 0
+        layout = self._sources().astype(numpy.int64) * self.nb_node + self._indices
+        low, high = divmod(keys, self.nb_node)
+        wanted = numpy.concatenate((keys, high * self.nb_node + low))  # both directions
+        positions = numpy.minimum(numpy.searchsorted(layout, wanted), len(layout) - 1)
+        found = (layout[positions] == wanted) & self._alive[positions]
+        found = found[:len(keys)] & found[len(keys):]
+        self._alive[positions[numpy.concatenate((found, found))]] = False
+        self._degrees -= numpy.bincount(numpy.concatenate((low[found], high[found])), minlength=self.nb_node).astype(self._degrees.dtype)
+        nb_removed = int(numpy.count_nonzero(found))
+        self.nb_edge -= nb_removed
+        return nb_removed
+
+    def remove_edges(self, edges:iter) -> int:
+        """Remove given edges, return the number of distinct ones that were in the graph"""
+        return self.remove_keys(self.pack(edges))
+
+    def nb_edges_among(self, nodes:numpy.ndarray or [int]) -> int:
+        """Number of remaining edges having both ends in given nodes"""
+        nodes = numpy.asarray(nodes, dtype=numpy.int64)
+        self._marks[nodes] = True
+        total = sum(int(numpy.count_nonzero(self._marks[self.neighbors(node)])) for node in nodes.tolist())
+        self._marks[nodes] = False
+        return total // 2
+
+    def triangles(self) -> numpy.ndarray:
+        """Array node -> number of triangles it belongs to.
+
+        Edges are oriented toward their end of higher degree, so that each
+        triangle is found once, from its lowest node, as a pair of
+        out-neighbors of that node linked by an oriented edge.
+
+        >>> Adjacency(6, [(0, 1), (0, 2), (0, 3), (1, 2), (1, 3), (2, 3), (3, 4), (4, 5)]).triangles().tolist()
+        [3, 3, 3, 3, 0, 0]
+
+        """
+        triangles = numpy.zeros(self.nb_node, dtype=numpy.int64)
+        indptr, indices = self.remaining_csr()
+        sources = numpy.repeat(numpy.arange(self.nb_node), self._degrees)
+        rank = numpy.empty(self.nb_node, dtype=numpy.int64)
+        rank[numpy.argsort(self._degrees, kind='stable')] = numpy.arange(self.nb_node)
+        forward = rank[sources] < rank[indices]
+        out_degrees = numpy.bincount(sources[forward], minlength=self.nb_node)
+        out_indptr = numpy.zeros(self.nb_node + 1, dtype=numpy.int64)
+        numpy.cumsum(out_degrees, out=out_indptr[1:])
+        out_indices = indices[forward]
+        for node in numpy.flatnonzero(out_degrees > 1).tolist():
+            outs = out_indices[out_indptr[node]:out_indptr[node + 1]]
+            self._marks[outs] = True
+            others = Adjacency.gather_rows(outs, out_indptr, out_indices)
+            found = self._marks[others]
+            self._marks[outs] = False
+            if found.any():  # a triangle for node, the out-neighbor, and the other
+                triangles[node] += numpy.count_nonzero(found)
+                numpy.add.at(triangles, numpy.repeat(outs, out_degrees[outs])[found], 1)
+                numpy.add.at(triangles, others[found], 1)
+        return triangles
+
+    def core_numbers(self) -> numpy.ndarray:
+        """Array node -> core number, the biggest k such that the node is in
+        a subgraph where each node has at least k neighbors.
+
+        Nodes are removed by increasing degree, with the bucket algorithm
+        of Batagelj and Zaversnik, in time linear in the number of edges.
+        A clique of k nodes being in the (k-1)-core, the max core number,
+        i.e. the degeneracy, plus one bounds the size of the cliques.
+
+        >>> Adjacency(6, [(0, 1), (0, 2), (0, 3), (1, 2), (1, 3), (2, 3), (3, 4), (4, 5)]).core_numbers().tolist()
+        [3, 3, 3, 3, 1, 1]
+
+        """
+        indptr, indices = self.remaining_csr()
+        indptr, indices = indptr.tolist(), indices.tolist()
+        degrees = self._degrees.tolist()
+        order = numpy.argsort(self._degrees, kind='stable').tolist()  # nodes by current degree
+        position = [0] * self.nb_node
+        for idx, node in enumerate(order):
+            position[node] = idx
+        start = [0] * (max(degrees, default=0) + 1)  # degree -> first position in order
+        for degree in degrees:
+            start[degree] += 1
+        start = [0] + list(itertools.accumulate(start))[:-1]
+        for node in order:  # order is permuted only after the current node
+            for nei in indices[indptr[node]:indptr[node + 1]]:
+                if degrees[nei] > degrees[node]:  # nei moves to the previous bucket
+                    first = start[degrees[nei]]
+                    other = order[first]
+                    order[first], order[position[nei]] = nei, other
+                    position[other], position[nei] = position[nei], first
+                    start[degrees[nei]] += 1
+                    degrees[nei] -= 1
+        return numpy.array(degrees, dtype=numpy.int64)
+
+    def remaining_csr(self) -> (numpy.ndarray, numpy.ndarray):
+        """Arrays indptr and indices of the CSR layout of the remaining edges"""
+        indptr = numpy.zeros(self.nb_node + 1, dtype=numpy.int64)
+        numpy.cumsum(self._degrees, out=indptr[1:])
+        return indptr, self._indices[self._alive]
+
+    @staticmethod
+    def gather_rows(nodes:numpy.ndarray, indptr:numpy.ndarray, indices:numpy.ndarray) -> numpy.ndarray:
+        """Concatenation of the rows of given nodes"""
+        starts, sizes = indptr[nodes], indptr[nodes + 1] - indptr[nodes]
+        offsets = numpy.repeat(starts - numpy.cumsum(sizes) + sizes, sizes)
+        return indices[offsets + numpy.arange(len(offsets))]
+
+    def max_common_neighbors(self) -> int:
+        """Maximal number of remaining neighbors shared by two distinct nodes.
+
+        Nodes are visited by decreasing degree, each one counting its wedges,
+        i.e. the paths node-neighbor-other, in a scratch array.
+        Two nodes sharing no more neighbors than the smallest degree,
+        the visit stops at the first node of degree not above the best count.
+
+        >>> Adjacency(5, [(0, 2), (0, 3), (0, 4), (1, 2), (1, 3), (2, 3)]).max_common_neighbors()
+        2
+        >>> Adjacency(2, [(0, 1)]).max_common_neighbors(), Adjacency(1, []).max_common_neighbors()
+        (0, 0)
+
+        """
+        indptr, indices = self.remaining_csr()
+        counts = numpy.zeros(self.nb_node, dtype=numpy.int64)
+        best = 0
+        for node in numpy.argsort(-self._degrees, kind='stable').tolist():
+            if self._degrees[node] <= best:
+                break  # no other node can share more neighbors with it
+            others = self.gather_rows(indices[indptr[node]:indptr[node+1]], indptr, indices)
+            others = others[others != node]
+            if not len(others):
+                continue
+            numpy.add.at(counts, others, 1)
+            best = max(best, int(counts[others].max()))
+            counts[others] = 0
+        return best
+
+    def greedy_biclique_score(self, max_size:int, deadline:float=None) -> int:
+        """Score of the best biclique S×C found greedily, S having at most
+        max_size nodes, and C being the at least 2 neighbors shared by S.
+        It is a lowerbound of the best biclique, that is not a star.
+
+        Each node, by decreasing degree, is a seed of S. S is extended with
+        the node sharing the most neighbors with it, until C has less than
+        2 nodes or S has max_size nodes. Seeds are visited until their degree
+        times max_size can't beat the best score, or until given deadline
+        (as given by time.time), so the score is valid even if not complete.
+
+        >>> adj = Adjacency(7, [(0, 3), (0, 4), (0, 5), (1, 3), (1, 4), (1, 5), (2, 3), (2, 4), (2, 5), (6, 3)])
+        >>> adj.greedy_biclique_score(2), adj.greedy_biclique_score(3), adj.greedy_biclique_score(5)
+        (6, 9, 9)
+        >>> adj.greedy_biclique_score(3, deadline=time.time() - 1)  # no time to find any
+        0
+        >>> Adjacency(4, [(0, 1), (0, 2), (0, 3)]).greedy_biclique_score(3)
+        0
+
+        """
+        indptr, indices = self.remaining_csr()
+        marks = numpy.zeros(self.nb_node, dtype=bool)
+        best = 0
+        for node in numpy.argsort(-self._degrees, kind='stable').tolist():
+            if self._degrees[node] * max_size <= best:
+                break  # no biclique containing that node can do better
+            if deadline is not None and time.time() > deadline:
+                break
+            common = indices[indptr[node]:indptr[node+1]]
+            candidates = numpy.unique(self.gather_rows(common, indptr, indices))
+            candidates = candidates[candidates != node]
+            for size in range(2, max_size + 1):
+                if not len(candidates):
+                    break
+                # number of neighbors each candidate shares with S
+                marks[common] = True
+                neighbors = self.gather_rows(candidates, indptr, indices)
+                starts = numpy.cumsum(self._degrees[candidates]) - self._degrees[candidates]
+                shared = numpy.add.reduceat(marks[neighbors].astype(numpy.int64), starts)
+                marks[common] = False
+                chosen = int(numpy.argmax(shared))
+                if shared[chosen] < 2:
+                    break
+                added = candidates[chosen]
+                common = numpy.intersect1d(common, indices[indptr[added]:indptr[added+1]], assume_unique=True)
+                best = max(best, size * len(common))
+                candidates = numpy.delete(candidates, chosen)
+        return best
+
+    def nbytes(self) -> int:
+        """Memory used by the arrays"""
+        return sum(array.nbytes for array in (self._indices, self._indptr, self._alive, self._degrees, self._marks))
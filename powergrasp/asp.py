@@ -2,50 +2,413 @@
 
 Function solve_motif_search is defined according to global constants.
 
+Two backends are available to run the solver, chosen by CLINGO_BACKEND:
+
+- subprocess: a clingo process is run (with the command built by clyngor),
+  and its JSON output is read.
+- module: the clingo python module solves in the current process.
+
+With the module backend, the encodings are parsed once per process,
+and kept in the ENCODINGS cache.
+
 """
 
+import re
 import math
+import contextlib
+import json
+import shlex
+import functools
+import subprocess
 import clyngor
+from powergrasp.utils import get_time
 from powergrasp.constants import (COVERED_EDGES_FROM_ASP, SHOW_STORY, SHOW_DEBUG,
-                                  MULTISHOT_MOTIF_SEARCH, CLINGO_MULTITHREADING)
+                                  MULTISHOT_MOTIF_SEARCH, CLINGO_MULTITHREADING,
+                                  CLINGO_BACKEND)
+
+
+class TimeBudget:
+    """Time allowed to a search, in seconds, or None if not limited.
+
+    When the search is stopped because of it, attribute exhausted is set,
+    and the models found so far are used.
+
+    cancel_when -- function returning True once the search became useless,
+                   for instance because another search found better.
+                   The search is then stopped, attribute cancelled is set,
+                   and no model is given.
+
+    """
+
+    def __init__(self, seconds:float=None, cancel_when:callable=None):
+        self.seconds = seconds
+        self.cancel_when = cancel_when
+        self.exhausted = False
+        self.cancelled = False
 
+    def deadline(self) -> float:
+        """Return the time at which a search starting now must stop"""
+        return math.inf if self.seconds is None else get_time() + self.seconds
 
-def _build_solver(step:int, lowerbound:int, upperbound:int, files:iter, graph:str, options:str) -> iter:
-    """Return iterator over found models"""
+    def next_check(self, deadline:float) -> float or None:
+        """Return the seconds to wait before checking again the search,
+        or None if it is to be waited until its end"""
+        delay = max(0., deadline - get_time())
+        if self.cancel_when is not None:
+            delay = min(delay, CANCEL_POLLING_DELAY)
+        return None if delay == math.inf else delay
+
+    def must_cancel(self) -> bool:
+        """True if the search became useless"""
+        if not self.cancelled and self.cancel_when is not None and self.cancel_when():
+            self.cancelled = True
+            if SHOW_STORY:
+                print('INFO search cancelled: it cannot beat the best motif found so far')
+        return self.cancelled
+
+    def __repr__(self):
+        seconds = 'unlimited' if self.seconds is None else '{}s'.format(self.seconds)
+        return '<TimeBudget {}{}{}>'.format(seconds, ' exhausted' if self.exhausted else '',
+                                            ' cancelled' if self.cancelled else '')
+
+CANCEL_POLLING_DELAY = 0.05  # seconds between two checks of the cancellation condition
+
+
+def _build_solver(step:int, lowerbound:int, upperbound:int, files:iter, graph:str, options:str, budget:TimeBudget=None, portfolio:[str]=()) -> iter:
+    """Return iterator over found models, paired with their optimization.
+
+    budget -- a TimeBudget limiting the search, or None.
+    portfolio -- clingo options of configurations to race against each other.
+
+    """
     constants = {'k': step, 'lowerbound': lowerbound, 'upperbound': upperbound}
     if COVERED_EDGES_FROM_ASP:
         constants['covered_edges_from_asp'] = 1
     options += CLINGO_MULTITHREADING
-    models = clyngor.solve(files=tuple(files), inline=str(graph), constants=constants, stats=False, options=options)
+    if len(portfolio) > 1:
+        portfolio = tuple(options + ' ' + configuration for configuration in portfolio)
+        race = _race_in_process if CLINGO_BACKEND == 'module' else _race_in_subprocess
+        return race(tuple(files), str(graph), constants, portfolio, budget)
+    if portfolio:  # only one configuration
+        options += ' ' + portfolio[0]
+    if CLINGO_BACKEND == 'module':
+        return _solve_in_process(tuple(files), str(graph), constants, options, budget)
+    return _solve_in_subprocess(tuple(files), str(graph), constants, options, budget)
+
+
+def _clingo_command(files:tuple, constants:dict, options:str, budget:TimeBudget=None) -> [str]:
+    """Return the command running clingo with JSON output on given files and stdin"""
+    time_limit = 0
+    if budget and budget.seconds is not None:
+        time_limit = max(1, math.ceil(budget.seconds))  # clingo only accepts seconds
+    command = clyngor.command(files=(*files, '-'), options=options + ' --outf=2', time_limit=time_limit,
+                              constants=constants, stats=False)
+    if SHOW_STORY:
+        print('SOLVE', ' '.join(command))
+    return command
+
+
+def _models_from_output(returncode:int, stdout:bytes, stderr:bytes) -> iter:
+    """Return iterator over the (model, optimization) found in JSON output
+    of a clingo process. Models are built only when iterated."""
+    if returncode >= 64 or not stdout:  # error, or out of memory
+        raise RuntimeError("clingo failed with code {}: {}".format(returncode, stderr.decode()))
+    return (
+        (model_from_atoms(witness['Value']), tuple(witness.get('Costs', ())))
+        for call in json.loads(stdout.decode())['Call']
+        for witness in call.get('Witnesses', ())
+        if 'Value' in witness  # others are lower bounds found by core-guided optimization
+    )
+
+
+def _solve_in_subprocess(files:tuple, graph:str, constants:dict, options:str, budget:TimeBudget=None) -> iter:
+    """Yield (model, optimization) found by a clingo process, with models
+    encoded like clyngor's careful parsing: predicate -> {args}"""
+    proc = subprocess.Popen(_clingo_command(files, constants, options, budget), stdin=subprocess.PIPE,
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    output = _communicate(proc, graph.encode(), budget)
+    if output is None:  # cancelled
+        return
+    if budget and proc.returncode & 1:  # search was interrupted
+        budget.exhausted = True
+    yield from _models_from_output(proc.returncode, *output)
+
+
+def _communicate(proc:subprocess.Popen, input:bytes, budget:TimeBudget=None) -> (bytes, bytes) or None:
+    """Return stdout and stderr of given clingo process once ended,
+    or None if the budget cancelled the search, in which case the process is killed.
+    The time limit is handled by clingo itself."""
+    if budget is None or budget.cancel_when is None:
+        return proc.communicate(input)
+    while True:
+        try:
+            return proc.communicate(input, timeout=CANCEL_POLLING_DELAY)
+        except subprocess.TimeoutExpired:
+            input = None  # already given to the process
+            if budget.must_cancel():
+                proc.kill()
+                proc.communicate()
+                return None
+
+
+def _race_in_subprocess(files:tuple, graph:str, constants:dict, portfolio:[str], budget:TimeBudget=None) -> iter:
+    """Yield (model, optimization) found by the first clingo process to end
+    its search, among one process for each options of given portfolio.
+    Other processes are killed, as are all of them if one fails."""
+    from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+    procs = [subprocess.Popen(_clingo_command(files, constants, options, budget), stdin=subprocess.PIPE,
+                              stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+             for options in portfolio]
+    with ThreadPoolExecutor(len(procs)) as executor:  # outputs must be read during the race
+        try:
+            outputs = [executor.submit(proc.communicate, graph.encode()) for proc in procs]
+            timeout = CANCEL_POLLING_DELAY if budget and budget.cancel_when else None
+            done = ()
+            while not done:
+                done = wait(outputs, timeout=timeout, return_when=FIRST_COMPLETED)[0]
+                if not done and budget.must_cancel():
+                    return
+            first = outputs.index(next(iter(done)))
+            # raises if the first racer failed
+            founds = {first: _models_from_output(procs[first].returncode, *outputs[first].result())}
+            winner = first
+            if budget and procs[first].returncode & 1:  # all are stopped by the time budget: keep the best
+                budget.exhausted = True
+                founds = [list(_models_from_output(proc.returncode, *output.result())) for proc, output in zip(procs, outputs)]
+                winner = _best_racer(founds)
+        finally:  # a proven optimum or an error: other processes are useless
+            for proc in procs:
+                if proc.poll() is None:
+                    proc.kill()
+    if SHOW_STORY:
+        print('INFO portfolio won by configuration {}: {}'.format(winner, portfolio[winner]))
+    yield from founds[winner]
+
+
+def _race_in_process(files:tuple, graph:str, constants:dict, portfolio:[str], budget:TimeBudget=None) -> iter:
+    """Yield (model, optimization) found by the first clingo control to end
+    its search, among one control for each options of given portfolio.
+    Other searches are cancelled, and all solve handles closed."""
+    controls = [_grounded_control(files, graph, constants, options) for options in portfolio]
+    founds = [[] for _ in controls]
+    with contextlib.ExitStack() as handles_closing:  # exiting a handle stops its search, and releases it
+        handles = [handles_closing.enter_context(control.solve(on_model=functools.partial(_store_model, found), async_=True))
+                   for control, found in zip(controls, founds)]
+        try:
+            deadline = budget.deadline() if budget else math.inf
+            winner = None
+            while winner is None:
+                winner = next((idx for idx, handle in enumerate(handles) if handle.wait(RACE_POLLING_DELAY)), None)
+                if winner is None and budget and budget.must_cancel():
+                    break
+                if winner is None and get_time() >= deadline:
+                    budget.exhausted = True
+                    winner = _best_racer(founds)
+        finally:  # stop all searches at once, before waiting for each one to end
+            for handle in handles:
+                handle.cancel()
+    if winner is None:  # cancelled
+        return
+    if SHOW_STORY:
+        print('INFO portfolio won by configuration {}: {}'.format(winner, portfolio[winner]))
+    yield from founds[winner]
+
+RACE_POLLING_DELAY = 0.01  # seconds waited on each control of a race
+
+
+def _store_model(found:list, model:object):
+    """Callback storing the given clingo model in given list"""
+    found.append((model_as_dict(model.symbols(shown=True)), tuple(model.cost)))
+
+
+def _best_racer(founds:[[(dict, tuple)]]) -> int:
+    """Return the index of the racer having found the best model.
+
+    >>> _best_racer([[({}, (3,)), ({}, (2,))], [], [({}, (1,))]])
+    2
+    >>> _best_racer([[], []])
+    0
+
+    """
+    return min(range(len(founds)), key=lambda idx: founds[idx][-1][1] if founds[idx] else (math.inf,))
+
+
+def yield_models(control:object, budget:TimeBudget=None) -> iter:
+    """Yield (model, optimization) found by given grounded clingo control,
+    stopping the search when the budget, if any, is exhausted or cancelled"""
+    if budget is None:
+        with control.solve(yield_=True) as handle:
+            for model in handle:
+                yield model_as_dict(model.symbols(shown=True)), tuple(model.cost)
+        return
+    deadline = budget.deadline()
+    with control.solve(yield_=True, async_=True) as handle:
+        while True:
+            handle.resume()
+            ready = handle.wait(budget.next_check(deadline))
+            while not ready and not budget.must_cancel() and get_time() < deadline:
+                ready = handle.wait(budget.next_check(deadline))
+            if budget.must_cancel():  # checked on each model too
+                handle.cancel()
+                return
+            if not ready:
+                handle.cancel()
+                budget.exhausted = True
+                if SHOW_STORY:
+                    print('INFO search stopped by its time budget of {}s'.format(budget.seconds))
+                return
+            model = handle.model()
+            if model is None:  # search is over
+                return
+            yield model_as_dict(model.symbols(shown=True)), tuple(model.cost)
+
+
+def _grounded_control(files:tuple, graph:str, constants:dict, options:str) -> object:
+    """Return a clingo control grounded on given files and graph"""
+    import clingo  # only needed by this backend
+    arguments = ['0', '--warn=none', *shlex.split(options)]
+    for name, value in constants.items():
+        arguments += ['-c', '{}={}'.format(name, value)]
     if SHOW_STORY:
-        print('SOLVE', models.command)
-    return models.by_predicate.careful_parsing
+        print('SOLVE in-process', ' '.join(arguments), ' '.join(files))
+    control = clingo.Control(arguments)
+    ENCODINGS.add_to(control, files)
+    control.add('base', [], graph)
+    control.ground([('base', [])])
+    return control
+
+
+def _solve_in_process(files:tuple, graph:str, constants:dict, options:str, budget:TimeBudget=None) -> iter:
+    """Yield (model, optimization) found by the clingo module, with models
+    encoded like clyngor's careful parsing: predicate -> {args}"""
+    yield from yield_models(_grounded_control(files, graph, constants, options), budget)
+
+
+class EncodingCache:
+    """Process-wide cache of the parsed ASP encodings.
+
+    Each combination of files is read and parsed once, then its statements
+    are given directly to each new control, which is faster than
+    having the control load the files.
+
+    Each process (like the compression workers) has its own cache.
+
+    """
+
+    def __init__(self):
+        self._statements = {}  # files -> parsed statements
+        self._load_time = {}  # files -> time needed by a control to load them
+        self._hits = {}  # files -> number of reuse
+        self._build_time = 0.  # time spent giving cached statements to controls
+
+    def prepare(self, files:iter):
+        """Parse given files if not already done"""
+        import clingo
+        from clingo import ast
+        files = tuple(files)
+        if files not in self._statements:
+            statements = []
+            ast.parse_files(list(files), statements.append)
+            self._statements[files] = tuple(statements)
+            self._hits[files] = -1  # first use is not a reuse
+            # reference: time needed without the cache
+            start = get_time()
+            reference = clingo.Control(['--warn=none'])
+            for fname in files:
+                reference.load(fname)
+            self._load_time[files] = get_time() - start
 
+    def add_to(self, control:object, files:iter):
+        """Add to given clingo control the parsed statements of given files"""
+        from clingo import ast
+        files = tuple(files)
+        self.prepare(files)
+        start = get_time()
+        with ast.ProgramBuilder(control) as builder:
+            for statement in self._statements[files]:
+                builder.add(statement)
+        if self._hits[files] >= 0:
+            self._build_time += get_time() - start
+        self._hits[files] += 1
 
-def oneshot_motif_search(step:int, lowerbound:int, upperbound:int, files:iter, graph:str, options:str='') -> iter:
+    @property
+    def time_saved(self) -> float:
+        """Estimation of the time saved by the cache, in seconds"""
+        return sum(self._load_time[files] * hits for files, hits in self._hits.items()) - self._build_time
+
+ENCODINGS = EncodingCache()
+
+
+def model_as_dict(symbols:iter) -> dict:
+    """Return the dict predicate -> {args} describing given clingo symbols,
+    as clyngor's careful parsing would"""
+    model = {}
+    for symbol in symbols:
+        model.setdefault(symbol.name, set()).add(tuple(map(_symbol_as_python, symbol.arguments)))
+    return {pred: frozenset(args) for pred, args in model.items()}
+
+
+def model_from_atoms(atoms:iter) -> dict:
+    """Return the dict predicate -> {args} describing given atoms,
+    as clyngor's careful parsing would.
+
+    Arguments are expected to be integers, constants or strings, as for
+    all atoms shown by the motif search encodings.
+
+    >>> model = model_from_atoms(['score(3)', 'star("a")', 'star("b, c")', 'clique'])
+    >>> model['score'], sorted(model['star']), model['clique']
+    (frozenset({(3,)}), [('"a"',), ('"b, c"',)], frozenset({()}))
+
+    """
+    model = {}
+    for atom in atoms:
+        name, _, args = atom.partition('(')
+        args = _ARGUMENT.findall(args[:-1])
+        model.setdefault(name, set()).add(tuple(int(arg) if _INTEGER.fullmatch(arg) else arg for arg in args))
+    return {pred: frozenset(args) for pred, args in model.items()}
+
+_ARGUMENT = re.compile(r'"(?:[^"\\]|\\.)*"|[^,"]+')
+_INTEGER = re.compile(r'-?[0-9]+')
+
+
+def _symbol_as_python(symbol) -> int or str:
+    """Return the python value of given clingo symbol argument"""
+    import clingo
+    if symbol.type == clingo.SymbolType.Number:
+        return symbol.number
+    return str(symbol)  # strings keep their quotes, as in clingo output
+
+
+def oneshot_motif_search(step:int, lowerbound:int, upperbound:int, files:iter, graph:str, options:str='', budget:TimeBudget=None, portfolio:[str]=()) -> iter:
     """Return iterable over the generator of the one best model
     containing atoms found in best model"""
     model = None
-    for model in _build_solver(step, lowerbound, upperbound, files, graph, options):
+    for model, _ in _build_solver(step, lowerbound, upperbound, files, graph, options, budget, portfolio):
         pass  # get the last one
-    if model:
+    if model and not (budget and budget.cancelled):
         yield model
 
 
-def multishot_motif_search(step:int, lowerbound:int, upperbound:int, files:iter, graph:str, options:str='') -> iter:
-    """Yield atoms found in bests models"""
-    all_models = _build_solver(step, lowerbound, upperbound, files, graph, options='--opt-mode=optN ' + options)
-    best_opt, models = math.inf, []
-    for model, opt in all_models.with_optimization:
+def multishot_motif_search(step:int, lowerbound:int, upperbound:int, files:iter, graph:str, options:str='', budget:TimeBudget=None, portfolio:[str]=()) -> iter:
+    """Yield atoms found in bests models, as soon as they are known to be optimal.
+
+    Models given while optimizing are not, except the last one, that is given
+    again during the enumeration of all optimal models. The first model of
+    the same optimization as the previous one thus starts the enumeration.
+
+    """
+    all_models = _build_solver(step, lowerbound, upperbound, files, graph, options='--opt-mode=optN ' + options, budget=budget, portfolio=portfolio)
+    best_opt, first_best, first_best_given = math.inf, None, False
+    for model, opt in all_models:
         if SHOW_DEBUG:
             print('OPT, MODEL:', opt[0], model)
         if opt[0] < best_opt:  # smaller is best
-            best_opt, models = opt[0], []  # model will be given again as last model, so no need to include it twice
+            best_opt, first_best = opt[0], model  # model will be given again during enumeration, so no need to include it twice
         else:
-            models.append(model)
-    yield from models
-
-
+            first_best_given = first_best_given or model == first_best
+            yield model
+    if budget and budget.exhausted and first_best is not None and not first_best_given:
+        yield first_best  # search was stopped before the model was given again
 # define the default behavior
 if MULTISHOT_MOTIF_SEARCH:
     solve_motif_search = multishot_motif_search
@@ -0,0 +1,115 @@
+"""Binary format of graphs, written once with `powergrasp convert`,
+then memory-mapped by each compression of the graph.
+
+The file holds the graph already split in connected components:
+nodes of a connected component are contiguous, sorted as Graph does,
+and the adjacency of each connected component is in the CSR layout
+of Adjacency, with node ids local to the connected component.
+Loading a connected component is then only slicing the arrays.
+Processes mapping the same file share its pages.
+
+Layout of the file: a magic string, the size of the header,
+a JSON header giving the dtype, offset and length of each array,
+then the arrays, each aligned on 64 bytes:
+
+    cc_nodes     -- cc -> first node of the cc (plus the total number of nodes)
+    indptr       -- node -> start of its row in indices (plus the end of the last row)
+    indices      -- neighbors of each node, row after row, as local node ids
+    name_offsets -- node -> start of its name in name_bytes (plus the end of the last name)
+    name_bytes   -- node names, utf-8 encoded
+    name_isint   -- node -> True if its name is an integer
+
+"""
+
+import json
+import numpy
+from powergrasp.adjacency import Adjacency
+
+
+MAGIC = b'PGRASPB1'
+ALIGNMENT = 64
+
+
+def is_binary_file(filename:str) -> bool:
+    """True if given file is in the binary format"""
+    with open(filename, 'rb') as fd:
+        return fd.read(len(MAGIC)) == MAGIC
+
+
+def write(filename:str, ccs:iter):
+    """Write in given file the connected components, given as pairs
+    (names, Adjacency), names being sorted as Graph does"""
+    arrays = {name: [] for name in ('cc_nodes', 'indptr', 'indices', 'name_offsets', 'name_bytes', 'name_isint')}
+    nb_node, nb_entry, nb_byte = 0, 0, 0  # seen so far
+    for names, adjacency in ccs:
+        indptr, indices = adjacency.csr()
+        encoded = [str(name).encode() for name in names]
+        arrays['cc_nodes'].append([nb_node])
+        arrays['indptr'].append(indptr[:-1] + nb_entry)
+        arrays['indices'].append(indices)
+        arrays['name_offsets'].append(numpy.cumsum([nb_byte] + [len(name) for name in encoded[:-1]]))
+        arrays['name_bytes'].append(numpy.frombuffer(b''.join(encoded), dtype=numpy.uint8))
+        arrays['name_isint'].append([isinstance(name, int) for name in names])
+        nb_node, nb_entry, nb_byte = nb_node + len(names), nb_entry + len(indices), nb_byte + sum(map(len, encoded))
+    arrays['cc_nodes'].append([nb_node])
+    arrays['indptr'].append([nb_entry])
+    arrays['name_offsets'].append([nb_byte])
+    dtypes = {'cc_nodes': numpy.int64, 'indptr': numpy.int64, 'indices': numpy.int32,
+              'name_offsets': numpy.int64, 'name_bytes': numpy.uint8, 'name_isint': bool}
+    arrays = {name: numpy.concatenate([numpy.empty(0, dtype=dtypes[name]), *chunks]).astype(dtypes[name])
+              for name, chunks in arrays.items()}
+    # header gives the position of arrays, that are placed after it
+    layout, offset = {}, 0
+    for name, array in arrays.items():
+        layout[name] = [array.dtype.str, offset, len(array)]
+        offset = _aligned(offset + array.nbytes)
+    header = json.dumps(layout).encode()
+    start = _aligned(len(MAGIC) + 8 + len(header))
+    with open(filename, 'wb') as fd:
+        fd.write(MAGIC)
+        fd.write(len(header).to_bytes(8, 'little'))
+        fd.write(header)
+        for name, array in arrays.items():
+            fd.seek(start + layout[name][1])
+            fd.write(array.tobytes())
+        fd.truncate(start + offset)
+
+
+def read(filename:str) -> iter:
+    """Yield (names, Adjacency) of each connected component found in given
+    binary file, the adjacency being mapped from the file"""
+    arrays, positions = _mapped_arrays(filename)
+    cc_nodes, indptr, names = arrays['cc_nodes'].tolist(), arrays['indptr'], arrays['name_offsets']
+    for first, last in zip(cc_nodes, cc_nodes[1:]):
+        start, stop = int(indptr[first]), int(indptr[last])
+        offset = positions['indices'] + start * arrays['indices'].itemsize
+        mapping = (filename, offset) if stop > start else None  # empty arrays are not mappable
+        adjacency = Adjacency.from_csr(numpy.array(indptr[first:last+1]) - start,
+                                       arrays['indices'][start:stop], mapping)
+        name_bytes = arrays['name_bytes'][names[first]:names[last]].tobytes()
+        offsets = (names[first:last+1] - names[first]).tolist()
+        yield [int(name) if isint else name for name, isint in zip(
+            (name_bytes[begin:end].decode() for begin, end in zip(offsets, offsets[1:])),
+            arrays['name_isint'][first:last].tolist()
+        )], adjacency
+
+
+def _mapped_arrays(filename:str) -> (dict, dict):
+    """Return the arrays mapped from given binary file, and their offset in it"""
+    with open(filename, 'rb') as fd:
+        if fd.read(len(MAGIC)) != MAGIC:
+            raise ValueError("File {} is not in powergrasp binary format".format(filename))
+        header = fd.read(int.from_bytes(fd.read(8), 'little'))
+    start = _aligned(len(MAGIC) + 8 + len(header))
+    arrays, positions = {}, {}
+    for name, (dtype, offset, length) in json.loads(header.decode()).items():
+        positions[name] = start + offset
+        if length:
+            arrays[name] = numpy.memmap(filename, dtype=dtype, mode='r', offset=start + offset, shape=(length,))
+        else:
+            arrays[name] = numpy.empty(0, dtype=dtype)
+    return arrays, positions
+
+
+def _aligned(offset:int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
@@ -0,0 +1,66 @@
+"""Checkpoints of the compression of a connected component,
+allowing to resume it after an interruption.
+
+A checkpoint holds the Graph being compressed (remaining edges, powernodes,
+poweredges and their hierarchy), the step counter, the progress in the recipe
+and the bounds of the searchers. It is written in CHECKPOINT_DIR,
+one file per connected component, every CHECKPOINT_STEPS steps
+or CHECKPOINT_SECONDS seconds, when the compression is interrupted,
+and at the end of the compression.
+
+"""
+
+import os
+import pickle
+from .utils import get_time
+from . import constants as const
+
+
+class Checkpoint:
+    """Saving and loading of the compression state of a connected component"""
+
+    def __init__(self, graph, cc_idx:int):
+        self.filename = os.path.join(const.CHECKPOINT_DIR, 'cc-{}.checkpoint'.format(cc_idx))
+        # the checkpoint of another graph is not to be resumed
+        self._graph_id = graph.uid, graph.nb_node, graph.initial_number_of_edge
+        self._last_step, self._last_time = 0, get_time()
+
+    def is_due(self, step:int) -> bool:
+        """True if a checkpoint is to be made at given step"""
+        return ((const.CHECKPOINT_STEPS and step - self._last_step >= const.CHECKPOINT_STEPS)
+                or (const.CHECKPOINT_SECONDS and get_time() - self._last_time >= const.CHECKPOINT_SECONDS))
+
+    def save(self, graph, searchers, **progress):
+        """Write the state of given graph and searchers, and given progress
+        of the compression (step, recipe position,…)"""
+        state = {
+            'graph_id': self._graph_id,
+            'graph': graph,
+            'bounds': {searcher.name: (searcher._lowerbound, searcher._upperbound, searcher.budget_hits)
+                       for searcher in searchers},
+            **progress,
+        }
+        os.makedirs(const.CHECKPOINT_DIR, exist_ok=True)
+        with open(self.filename + '.tmp', 'wb') as fd:
+            pickle.dump(state, fd, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(self.filename + '.tmp', self.filename)  # never leave a partial checkpoint
+        self._last_step, self._last_time = progress.get('step', 0), get_time()
+
+    def restore(self, graph, searchers) -> dict or None:
+        """Put given graph and searchers in the last saved state,
+        and return the progress of the compression,
+        or None if there is no checkpoint for that graph"""
+        try:
+            with open(self.filename, 'rb') as fd:
+                state = pickle.load(fd)
+        except FileNotFoundError:
+            return None
+        if state.pop('graph_id') != self._graph_id:
+            print('WARNING checkpoint {} was made for another graph. Compression starts from step 1.'.format(self.filename))
+            return None
+        vars(graph).update(vars(state.pop('graph')))  # searchers keep a reference to graph
+        for searcher in searchers:
+            if searcher.name in state['bounds']:
+                searcher._lowerbound, searcher._upperbound, searcher.budget_hits = state['bounds'][searcher.name]
+        self._last_step = state.get('step', 0)
+        return state
@@ -3,10 +3,14 @@
 """
 
 import os
+import sys
 import argparse
 
 
 def parse_args(description:str, args:iter=None) -> dict:
+    args = sys.argv[1:] if args is None else list(args)
+    if args[:1] == ['convert']:
+        return convert_parser(description).parse_args(args[1:])
     return cli_parser(description).parse_args(args)
 
 def existant_file(filepath:str) -> str:
@@ -44,5 +48,23 @@ def cli_parser(description:str) -> argparse.ArgumentParser:
                         help="Print detected configuration, then quit")
     parser.add_argument('--recipe', '-r', default=None, type=str,
                         help="Use content of given filename as a recipe")
+    parser.add_argument('--resume', action='store_true',
+                        help="Start each connected component from its last checkpoint")
+    parser.set_defaults(command='compress')
+
+    return parser
+
+
+def convert_parser(description:str) -> argparse.ArgumentParser:
+    """Parser of the convert command, called as `powergrasp convert`"""
+    parser = argparse.ArgumentParser(prog='powergrasp convert', description=(
+        "Write the graph in the binary format, that is faster to compress again."
+        " The binary file can be given as input file to compress."
+    ))
+    parser.add_argument('infile', type=existant_file,
+                        help="Name of the input file to convert")
+    parser.add_argument('outfile', type=writable_file,
+                        help="Name of the binary file to produce")
+    parser.set_defaults(command='convert')
 
     return parser
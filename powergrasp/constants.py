@@ -74,15 +74,45 @@ constants = {
     # Search for multiple motif in a single search. Accelerate the solving for graph with lots of equivalent motifs.
     'MULTISHOT_MOTIF_SEARCH': True,
 
+    # Maximal number of non-overlapping motifs compressed at each step with multishot motif search. Zero for no limit.
+    'MULTISHOT_MOTIF_LIMIT': 0,
+
     # Optimization on biclique lowerbound computation. Can be costly. Deactivate with 2. With value at n, up to n neighbors are considered.
     'BICLIQUE_LOWERBOUND_MAXNEI': 2,
 
+    # Time in seconds given to the biclique lowerbound computation when biclique lowerbound maxnei is above 2. None for no limit.
+    'BICLIQUE_LOWERBOUND_TIME_BUDGET': 10,
+
     # Arbitrary parameters to give to clingo (note that some, like multithreading or optmode, may already be set by other options).
     'CLINGO_OPTIONS': {},
 
     # Number of CPU available to clingo (or a string like '2,join' or '48,compete'), or 0 for autodetect number of CPU.
     'CLINGO_MULTITHREADING': 1,
 
+    # How to run clingo: 'subprocess' (through clyngor) or 'module' (in-process, through the clingo python module).
+    'CLINGO_BACKEND': 'subprocess',
+
+    # Clingo options of configurations racing on each search (a list, or a dict motif name -> list). The first to prove optimality wins.
+    'CLINGO_PORTFOLIO': None,
+
+    # Candidate clingo options (a list, or a dict motif name -> list). Each search uses the candidate that was the fastest so far.
+    'CLINGO_ADAPTIVE_OPTIONS': None,
+
+    # Time in seconds given to a motif search (a number, or a dict motif name -> number), after which the best motif found so far is used. None for no limit.
+    'SEARCH_TIME_BUDGET': None,
+
+    # Time in seconds given to the compression of a connected component, after which the compression stops. None for no limit.
+    'CC_TIME_BUDGET': None,
+
+    # Directory where the compression state of each connected component is saved, to be resumed with --resume. None for no checkpoint.
+    'CHECKPOINT_DIR': None,
+
+    # Number of steps between two checkpoints. None for no limit.
+    'CHECKPOINT_STEPS': 10,
+
+    # Time in seconds between two checkpoints. None for no limit.
+    'CHECKPOINT_SECONDS': None,
+
     # Do not search for cliques
     'ONLY_BICLIQUES': False,
 
@@ -113,9 +143,12 @@ constants = {
     # Perform the search for motifs in different process instead of sequentially.
     'PARALLEL_MOTIF_SEARCH': False,
 
-    # Number of processes to work on connected components. Zero to get one per cc. One to deactivate.
+    # Number of processes to work on connected components. Zero to get one per cc, up to the number of CPUs. One to deactivate.
     'PARALLEL_CC_COMPRESSION': 1,
 
+    # Number of edges read at once from the input file. If set, only one connected component at a time is held in memory. None to load the whole graph.
+    'STREAMING_CHUNK_SIZE': None,
+
     # Define in which order the motifs are tested.
     'MOTIF_TYPE_ORDER': 'star,clique,non-star-biclique,quasi-biclique,biclique,triplet',
 
@@ -128,9 +161,7 @@ constants = {
     # 'SPECIAL_CASES_DETECTION': True,
 }
 
-_derived_constants = {
-    'KEEP_NX_GRAPH': lambda c: c['GRAPH_FILTERING'],
-}
+_derived_constants = {}
 
 
 def make_key(key:str) -> str:
@@ -260,6 +291,63 @@ def _convert_clingo_options(value:dict or str) -> dict:
     return value
 
 
+def _convert_clingo_options_list(value:None or list or dict) -> dict:
+    """Return a map from motif name to a tuple of clingo options,
+    with None key for default.
+
+    >>> _convert_clingo_options_list(None)
+    {None: ()}
+    >>> _convert_clingo_options_list(['--configuration=trendy', '--configuration=crafty'])
+    {None: ('--configuration=trendy', '--configuration=crafty')}
+    >>> _convert_clingo_options_list({'Non star biclique': ['--opt-strategy=usc', '']})
+    {'non-star-biclique': ('--opt-strategy=usc', ''), None: ()}
+
+    """
+    if isinstance(value, str):
+        value = ast.literal_eval(value)
+    if not isinstance(value, dict):
+        value = {None: value}
+    value = {None if motif is None else motif.lower().replace(' ', '-').replace('_', '-'): tuple(portfolio or ())
+             for motif, portfolio in value.items()}
+    value.setdefault(None, ())
+    return value
+
+
+def _convert_clingo_backend(value:str) -> str:
+    """Return the normalized name of the clingo backend.
+
+    >>> _convert_clingo_backend('Module')
+    'module'
+    >>> _convert_clingo_backend(' subprocess')
+    'subprocess'
+
+    """
+    value = value.strip(' "\'\t\n').lower()
+    if value not in {'subprocess', 'module'}:
+        raise ValueError("Invalid value for option CLINGO BACKEND: {} (expected"
+                         " subprocess or module)".format(value))
+    return value
+
+
+def _convert_search_time_budget(value:None or float or dict) -> dict:
+    """Return a map from motif name to time budget, with None key for default.
+
+    >>> _convert_search_time_budget(None)
+    {None: None}
+    >>> _convert_search_time_budget(30)
+    {None: 30}
+    >>> _convert_search_time_budget({'Non star biclique': 10})
+    {'non-star-biclique': 10, None: None}
+
+    """
+    if not isinstance(value, dict):
+        value = {None: value}
+    value = {None if motif is None else motif.lower().replace(' ', '-').replace('_', '-'): budget
+             for motif, budget in value.items()}
+    value.setdefault(None, None)
+    return value
+
+
 def _convert_motif_type_order(value:str) -> callable:
     """Return a function returning sorted searchers according to the given value.
 
@@ -315,6 +403,10 @@ _CONVERTIONS = {
     'CLINGO_MULTITHREADING': _convert_parallel_mode_option,
     'BICLIQUE_LOWERBOUND_MAXNEI': int,
     'CLINGO_OPTIONS': _convert_clingo_options,
+    'CLINGO_BACKEND': _convert_clingo_backend,
+    'CLINGO_PORTFOLIO': _convert_clingo_options_list,
+    'CLINGO_ADAPTIVE_OPTIONS': _convert_clingo_options_list,
+    'SEARCH_TIME_BUDGET': _convert_search_time_budget,
     'MOTIF_TYPE_ORDER': _convert_motif_type_order,
     'CC_STATISTIC_FILE': _convert_erased_file,
     'COMPRESSION_STATISTIC_FILE': _convert_erased_file,
@@ -378,9 +470,19 @@ OPTIONS_CATEGORIES = utils.reverse_dict({
     'BUBBLE_SIMPLIFY_QUOTES': 'input',
     'CONFIG_FILE': 'input',
     'MULTISHOT_MOTIF_SEARCH': 'optimization',
+    'MULTISHOT_MOTIF_LIMIT': 'optimization',
     'BICLIQUE_LOWERBOUND_MAXNEI': 'optimization',
+    'BICLIQUE_LOWERBOUND_TIME_BUDGET': 'optimization',
     'CLINGO_OPTIONS': 'clingo',
     'CLINGO_MULTITHREADING': 'clingo',
+    'CLINGO_BACKEND': 'clingo',
+    'CLINGO_PORTFOLIO': 'clingo',
+    'CLINGO_ADAPTIVE_OPTIONS': 'clingo',
+    'SEARCH_TIME_BUDGET': 'optimization',
+    'CC_TIME_BUDGET': 'optimization',
+    'CHECKPOINT_DIR': 'output',
+    'CHECKPOINT_STEPS': 'output',
+    'CHECKPOINT_SECONDS': 'output',
     'USE_STAR_MOTIF': 'optimization',
     'ONLY_BICLIQUES': 'output',
     'QUASIBICLIQUES': 'output',
@@ -389,10 +491,10 @@ OPTIONS_CATEGORIES = utils.reverse_dict({
     'ONLY_TRIPLETS': 'output',
     'OPTIMIZE_FOR_MEMORY': 'optimization',
     'KEEP_SINGLE_NODES': 'output',
-    'KEEP_NX_GRAPH': 'optimization',
     'GRAPH_FILTERING': 'optimization',
     'PARALLEL_MOTIF_SEARCH': 'optimization',
     'PARALLEL_CC_COMPRESSION': 'optimization',
+    'STREAMING_CHUNK_SIZE': 'input',
     'MOTIF_TYPE_ORDER': 'optimization',
 
     # 'TERMINAL_TREES_POSTPONING': 'optimization',
@@ -2,52 +2,54 @@
 knowing the bounds on the size of the motif to search in it.
 
 All routines follow the following interface:
-- arguments are the graph and the bounds
-- yield valid edges as pairs of nodes
+- arguments are the graph node index and the bounds
+- return a boolean mask over the edges given by index.adjacency.edge_array(),
+  True for valid edges
+
 
 """
 
-import networkx as nx
+import numpy
+from powergrasp.adjacency import Adjacency
+from powergrasp.node_index import NodeIndex
 
 
-def for_biclique(graph:nx.Graph, lowerbound:int, upperbound:int) -> [(str, str)]:
+def for_biclique(index:NodeIndex, lowerbound:int, upperbound:int) -> numpy.ndarray:
     """
     Remove any edge that the product of its nodes degrees is inferior to lowerbound.
-    """
-    def ok_to_go(edge:tuple) -> bool:
-        one, two = edge
-        degone, degtwo = map(graph.degree, edge)
-        return degone * degtwo >= lowerbound
-    for edge in graph.edges:
-        if ok_to_go(edge):
-            yield edge
 
+    >>> index = NodeIndex(Adjacency(5, [(0, 1), (1, 2), (2, 0), (2, 3), (3, 4)]))
+    >>> for_biclique(index, 5, 6).tolist()
+    [False, True, True, True, False]
 
-def for_star(graph:nx.Graph, lowerbound:int, upperbound:int) -> [(str, str)]:
     """
+    sources, targets = index.adjacency.edge_array()
+    degrees = index.degrees.astype(numpy.int64)
+    return degrees[sources] * degrees[targets] >= lowerbound
+
+
+def for_star(index:NodeIndex, lowerbound:int, upperbound:int) -> numpy.ndarray:
+    """Remove any edge that none of its nodes have enough neighbors to be a star center.
+
+    >>> index = NodeIndex(Adjacency(5, [(0, 1), (1, 2), (2, 0), (2, 3), (3, 4)]))
+    >>> for_star(index, 3, 5).tolist()
+    [False, True, True, True, False]
+
     """
-    def ok_to_go(edge:tuple) -> bool:
-        one, two = edge
-        degone, degtwo = map(graph.degree, edge)
-        return not all((
-            degone < lowerbound,
-            degtwo < lowerbound,
-        ))
-    for edge in graph.edges:
-        if ok_to_go(edge):
-            yield edge
-
-
-def for_clique(graph:nx.Graph, lowerbound:int, upperbound:int) -> [(str, str)]:
+    sources, targets = index.adjacency.edge_array()
+    degrees = index.degrees
+    return (degrees[sources] >= lowerbound) | (degrees[targets] >= lowerbound)
+
+
+def for_clique(index:NodeIndex, lowerbound:int, upperbound:int) -> numpy.ndarray:
     """
     Remove an edge when one participating node has a clustering coefficient equal to 0.
+
+    >>> index = NodeIndex(Adjacency(5, [(0, 1), (1, 2), (2, 0), (2, 3), (3, 4)]))
+    >>> for_clique(index, 3, 5).tolist()
+    [True, True, True, True, False]
+
     """
-    clusterings = {}  # node -> clustering coefficient
-    def clustering_of(node:str) -> float:
-        if node in clusterings:
-            return clusterings[node]
-        else:
-            return clusterings.setdefault(node, nx.clustering(graph, node))
-    for edge in graph.edges:
-        if any(clustering_of(node) > 0. for node in edge):
-            yield edge
+    sources, targets = index.adjacency.edge_array()
+    in_triangle = index.triangles > 0
+    return in_triangle[sources] | in_triangle[targets]
@@ -1,3 +1,4 @@
+import numpy
 import phasme
 import networkx
 import itertools
@@ -5,39 +6,124 @@ from collections import defaultdict
 from pprint import pprint
 from powergrasp import utils
 from powergrasp import constants
+from powergrasp import binary
+from powergrasp import streaming
 from powergrasp import edge_filtering
 from powergrasp import constants as const
 from powergrasp.motif import Motif
+from powergrasp.adjacency import Adjacency
+from powergrasp.node_index import NodeIndex
 from powergrasp.recipe import Recipe
 
 
-def proper_nx_graph(graph:networkx.Graph) -> networkx.Graph:
-    """Return the same graph, but with properly formatted node names."""
-    def node_repr(node:str or int or float) -> str or int or float:
-        """Ensure that nodes in graph are well encoded, ie that integer
-        nodes are integer in graph, because ASP will understand
-        and handle them as integer.
-        """
-        if isinstance(node, str) and node.isnumeric():
-            return int(node)
-        elif isinstance(node, int):
-            return node
-        # print('NODE REPR:', node, utils.normalized_name(node))
-        return utils.normalized_name(node)  # needed to avoid collisions with constants, variable,…
-    proper = type(graph)()
-    repr_edges = (frozenset(map(node_repr, edge)) for edge in graph.edges)  # apply node representation
-    if const.KEEP_SINGLE_NODES:
-        # replace self loops by node existence notification
-        for edge in repr_edges:
-            if len(edge) == 1:
-                proper.add_node(next(iter(edge)))
-            elif len(edge) == 2:
-                proper.add_edge(*edge)
-            else:
-                raise ValueError("invalid edge components: " + str(edge))
-    else:  # ignore them
-        proper.add_edges_from(edge for edge in repr_edges if len(edge) == 2)
-    return proper
+def node_repr(node:str or int or float) -> str or int or float:
+    """Ensure that nodes in graph are well encoded, ie that integer
+    nodes are integer in graph, because ASP will understand
+    and handle them as integer.
+    """
+    if isinstance(node, str) and node.isnumeric():
+        return int(node)
+    elif isinstance(node, int):
+        return node
+    # print('NODE REPR:', node, utils.normalized_name(node))
+    return utils.normalized_name(node)  # needed to avoid collisions with constants, variable,…
+
+
+def edges_from_file(filename:str, chunk_size:int=None) -> iter:
+    """Yield the edges found in given file, as pairs of properly formatted
+    node names.
+
+    ASP files are read without building a graph. With KEEP_SINGLE_NODES,
+    self loops are kept as the notification of a node existence.
+
+    chunk_size -- number of lines of ASP files parsed at once,
+                  or None to parse the whole file.
+
+    """
+    filename = phasme.commons.normalize_filename(filename)
+    if phasme.commons.format_of_file(filename) in {'lp', ''}:
+        edges = _edges_from_asp_file(filename, chunk_size)
+    else:  # standard formats are only readable by networkx
+        edges = phasme.build_graph.graph_from_standard_file(filename).edges
+    for source, target in edges:
+        source, target = node_repr(source), node_repr(target)
+        if source != target or const.KEEP_SINGLE_NODES:
+            yield source, target
+
+
+def _edges_from_asp_file(filename:str, chunk_size:int=None) -> iter:
+    """Yield the edges found in given ASP file, parsing given number of lines at once"""
+    with open(filename) as fd:
+        if chunk_size is None:
+            yield from phasme.extract_links.links_from_lines(fd)
+            return
+        for lines in iter(lambda: tuple(itertools.islice(fd, chunk_size)), ()):
+            yield from phasme.extract_links.links_from_lines(lines)
+
+
+def connected_components(edges:iter) -> [[tuple]]:
+    """Return the edges of given graph grouped by connected component,
+    in order of appearance.
+
+    Nodes are gathered with a union-find over the edges,
+    given only once each, whatever their direction.
+    A self loop stands for its node.
+
+    >>> connected_components([(1, 2), ('a', 'b'), (2, 1), (2, 5), (6, 6)])
+    [[(1, 2), (2, 5)], [('a', 'b')], [(6, 6)]]
+
+    """
+    table = streaming.NodeTable()
+    keys = {}  # edges packed as integers, used as an ordered set
+    for source, target in edges:
+        source, target = table.union(source, target)
+        keys[source << 32 | target] = None
+    ccs = defaultdict(list)  # root -> edges
+    for key in keys:
+        source, target = key >> 32, key & 0xFFFFFFFF
+        ccs[table.find(source)].append((table.names[source], table.names[target]))
+    return [ccs[root] for root in sorted(ccs)]
+
+
+def named_adjacency(names:iter, edges:iter) -> ([str or int], Adjacency):
+    """Return the given node names sorted according to node_order,
+    and the Adjacency of given edges between the nodes, numbered in that order.
+    Nodes are interned as integers, names being used only for input and output.
+
+    >>> names, adjacency = named_adjacency({'"b"', 2, '"a"'}, [('"b"', 2), (2, '"a"')])
+    >>> names, list(adjacency.edges())
+    ([2, '"a"', '"b"'], [(0, 1), (0, 2)])
+
+    """
+    names = sorted(names, key=node_order)
+    ids = {name: idx for idx, name in enumerate(names)}
+    return names, Adjacency(len(names), ((ids[source], ids[target]) for source, target in edges))
+
+
+def adjacencies_from_file(filename:str, chunk_size:int=None) -> iter:
+    """Yield (names, Adjacency) of each connected component found in given file
+    (see named_adjacency).
+
+    chunk_size -- if given, the file is read by chunks of that number of edges,
+                  and the connected components are built one at a time (see streaming module).
+
+    """
+    if chunk_size:
+        ccs = streaming.connected_components(edges_from_file(filename, chunk_size), chunk_size)
+    else:
+        ccs = connected_components(edges_from_file(filename))
+    for edges in ccs:
+        yield named_adjacency(frozenset(itertools.chain.from_iterable(edges)), edges)
+
+
+def node_order(name:str or int) -> tuple:
+    """Key sorting node names as clingo does: integers first, then strings.
+
+    >>> sorted(['"b"', 3, '"a"', 1], key=node_order)
+    [1, 3, '"a"', '"b"']
+
+    """
+    return isinstance(name, str), name
 
 
 class Graph:
@@ -48,43 +134,86 @@ class Graph:
     Note the uid parameter for constructor
 
     """
-    def __init__(self, graph:str or networkx.Graph):
+    def __init__(self, graph:str or networkx.Graph or [tuple], *, nb_cc:int=None):
+        """graph -- a file, a networkx graph or a list of edges given once (a self loop
+                 standing for its node).
+        nb_cc -- number of connected components, computed if not given.
+
+        """
+        if isinstance(graph, str):
+            graph = phasme.build_graph.graph_from_file(graph)
         if isinstance(graph, networkx.Graph):
-            nxgraph = networkx.Graph(graph)
-        elif isinstance(graph, str):
-            nxgraph = phasme.build_graph.graph_from_file(graph)
+            edges, names = tuple(graph.edges), graph.nodes
+            if nb_cc is None: nb_cc = networkx.number_connected_components(graph)
+        elif isinstance(graph, (list, tuple)):
+            edges, names = graph, frozenset(itertools.chain.from_iterable(graph))
+            if nb_cc is None: nb_cc = len(connected_components(edges))
         else:
             raise ValueError("Unexpected {}".format(graph))
-        # internal graph representation
-        self.__edges = map(frozenset, nxgraph.edges)
         if const.TEST_INTEGRITY:
-            self.__edges = tuple(self.__edges)
-            for args in self.__edges:
-                if len(args) > 2:
-                    print('WARNING: Weird edge: {}. It will be filtered.'.format(args))
-                else:
-                    assert len(args) == 2, args
-        self.__edges = set(edge for edge in self.__edges if len(edge) == 2)
+            for args in edges:
+                assert len(args) == 2, args
+        self.__setup(*named_adjacency(names, edges), nb_cc)
 
+    @staticmethod
+    def from_adjacency(names:[str or int], adjacency:Adjacency, nb_cc:int=1) -> 'Graph':
+        """Return the graph of given adjacency, where node i is named names[i],
+        names being sorted according to node_order"""
+        graph = Graph.__new__(Graph)
+        graph.__setup(names, adjacency, nb_cc)
+        return graph
+
+    def __setup(self, names:[str or int], adjacency:Adjacency, nb_cc:int):
+        self.__names = names  # node id -> node name
+        self.__ids = {name: idx for idx, name in enumerate(self.__names)}
+        self.__uid = str(min(self.__names, key=str))
         # data
-        self.__nodes = set(nxgraph.nodes)
-        self.__uid = str(min(self.__nodes, key=str))
-        self.__nb_node = len(self.__nodes)
-        self.__nb_cc = networkx.number_connected_components(nxgraph)
-        self._nxgraph = nxgraph if constants.KEEP_NX_GRAPH else networkx.freeze(nxgraph)
-        self.__initial_number_of_edge = len(self.__edges)
+        self.__nb_node = len(self.__names)
+        self.__nodes = set(range(self.__nb_node))
+        self.__nb_cc = nb_cc
+        self.__adjacency = adjacency
+        self.__initial_number_of_edge = self.__adjacency.nb_edge
         self.__active_recipe = None
+        self.__index = NodeIndex(self.__adjacency)  # bounds data, updated at each compression
 
-        self.__hierarchy = set()  # inclusions between powernodes
+        self.__hierarchy = {}  # inclusions between powernodes -> include_block atom
         self.__powernodes = defaultdict(set)  # (step, set) -> {node in powernode}
         self.__poweredges = defaultdict(set)  # (step, set) -> (step, set)
+        self.__memberships = defaultdict(set)  # node -> {powernode directly containing it}
+        self.__pnode_parent = {}  # powernode -> powernode directly containing it
+        self.__closure = defaultdict(set)  # powernode -> {node contained, directly or not}
+
+        # ASP atoms are formatted once, then compress only applies the changes
+        self.__edge_atoms = self.__adjacency.edge_labels('edge({},{}).'.format)
+        self.__block_atoms = {}  # (step, set, node) -> block atom, for all powernodes containing the node
+        # caches below hold for the graph as long as the node index version is unchanged
+        self.__common_neighbors = None, 0  # (index version, max number of neighbors shared by two nodes)
+        self.__biclique_score = None, 0  # ((index version, max size), score of a biclique found greedily)
+        self.__core_numbers = None, None  # (index version, core number of each node)
 
     @staticmethod
-    def ccs_from_file(filename:str) -> iter:
-        """Yield graphs found in given filename. Each graph is a connected component."""
-        nxgraph = proper_nx_graph(phasme.build_graph.graph_from_file(filename))
-        yield from (Graph(nxgraph.subgraph(cc))
-                    for cc in networkx.connected_components(nxgraph))
+    def ccs_from_file(filename:str, chunk_size:int=None) -> iter:
+        """Yield graphs found in given filename. Each graph is a connected component.
+
+        chunk_size -- if given, the file is read by chunks of that number of edges,
+                      and the graphs are built one at a time (see streaming module).
+                      Files in binary format (see binary module) are always read that way.
+
+        """
+        if binary.is_binary_file(filename):
+            ccs = binary.read(filename)
+        else:
+            ccs = adjacencies_from_file(filename, chunk_size)
+        yield from (Graph.from_adjacency(names, adjacency) for names, adjacency in ccs)
+
+    def node_id(self, name:str or int) -> int:
+        """Return the id of the node of given name, as used in ASP and motifs.
+        Unknown names are returned as is."""
+        return self.__ids.get(name, name)
+
+    def node_name(self, node:int) -> str or int:
+        """Return the name of the node of given id"""
+        return self.__names[node]
 
     def with_recipe(self, recipe:Recipe or None) -> object:
         """Change the active recipe, return self.
@@ -102,7 +231,7 @@ class Graph:
         return sum(1 for _ in itertools.chain.from_iterable(self.__poweredges.values()))
     @property
     def number_of_simple_edge(self) -> int:
-        return len(self.__edges)
+        return self.__adjacency.nb_edge
     @property
     def number_of_powernode(self) -> int:
         return len(self.__powernodes)
@@ -116,7 +245,8 @@ class Graph:
 
     @property
     def nodes(self) -> frozenset:
-        return frozenset(self.__nodes)
+        """Names of the nodes"""
+        return frozenset(map(self.node_name, self.__nodes))
 
     @staticmethod
     def compression_metrics_from_data(data:(int, int, int, int), nb_node:int=-1) -> [(str, float)]:
@@ -144,11 +274,19 @@ class Graph:
 
         """
         if include_nodes:
-            contained_nodes = frozenset(itertools.chain.from_iterable(self.__powernodes.values()))
-            yield from (node for node in self.__nodes if node not in contained_nodes)
+            yield from (node for node in self.__nodes if not self.__memberships.get(node))
         if include_pnodes:
-            contained_pnodes = frozenset(itertools.chain.from_iterable((s, n) for _, __, s, n in self.__hierarchy))
-            yield from (pnode for pnode in self.__powernodes if pnode not in contained_pnodes)
+            yield from (pnode for pnode in self.__powernodes if pnode not in self.__pnode_parent)
+
+    def powernode_of(self, node:int) -> (int, int) or None:
+        """Return the powernode (step, set) directly containing given node,
+        or None if the node is a root"""
+        return next(iter(self.__memberships.get(node, ())), None)
+
+    def parent_of(self, powernode:(int, int)) -> (int, int) or None:
+        """Return the powernode directly containing given powernode,
+        or None if it is a root"""
+        return self.__pnode_parent.get(powernode)
 
 
     def as_asp(self, step:int, powerobjects:bool=False,
@@ -168,34 +306,32 @@ class Graph:
         filter_by_active_recipe -- only yield edges found in active recipe.
 
         """
-        if upperbound is None: upperbound = len(self.__edges)
+        if upperbound is None: upperbound = self.__adjacency.nb_edge
         nb_filters = sum((filter_for_bicliques, filter_for_cliques, filter_for_stars))
         assert nb_filters in {0, 1}, "Too much filters asked: " + str(nb_filters)
         assert step > 0, step
         assert (step-1) >= 0, step
         # define the edges to work on (depending of choosen filter and bounds)
-        filtered_edges = self.__edges
+        positions = self.__adjacency.edge_positions()
         # filter according to recipe, or if no active recipe, according to motifs
         if self.__active_recipe and filter_by_active_recipe:
             if self.__active_recipe.isextendable:
                 pass  # do not prevent any edge to be covered
             else:  # not extendable, so only use the available edges
-                filtered_edges = self.__edges & self.__active_recipe.covered_edges
+                recipe_edges = frozenset(frozenset(map(self.node_id, edge)) for edge in self.__active_recipe.covered_edges)
+                positions = positions[[frozenset(edge) in recipe_edges for edge in self.__adjacency.edges()]]
         elif constants.GRAPH_FILTERING:
-            if filter_for_bicliques: filter = edge_filtering.for_biclique
-            elif filter_for_cliques: filter = edge_filtering.for_clique
-            elif filter_for_stars: filter = edge_filtering.for_star
-            if filter:
-                filtered_edges = filter(self._nxgraph, lowerbound, upperbound)
+            edge_filter = None
+            if filter_for_bicliques: edge_filter = edge_filtering.for_biclique
+            elif filter_for_cliques: edge_filter = edge_filtering.for_clique
+            elif filter_for_stars: edge_filter = edge_filtering.for_star
+            if edge_filter:
+                positions = positions[edge_filter(self.__index, lowerbound, upperbound)]
 
         # yield the wanted atoms.
-        for source, target in filtered_edges:
-            yield 'edge({},{}).'.format(source, target)
-        for (stepa, seta), nodes in self.__powernodes.items():
-            for node in nodes:
-                yield 'block({},{},{}).'.format(stepa, seta, node)
-        for stepa, seta, stepb, setb in self.__hierarchy:
-            yield 'include_block({},{},{},{}).'.format(stepa, seta, stepb, setb)
+        yield from self.__edge_atoms[positions].tolist()
+        yield from self.__block_atoms.values()
+        yield from self.__hierarchy.values()
         if powerobjects:
             raise NotImplementedError()
 
@@ -210,29 +346,29 @@ class Graph:
         # Get the powernodes as set of nodes, and build the new ones.
         if not const.COVERED_EDGES_FROM_ASP:
             powernodes = set(motif.powernodes) | set(motif.stars)  # set of nodes
+        added_nodes = set()  # nodes put in the new powernodes
         for numset, node in motif.new_powernodes:
             uid = motif.uid, numset
             if const.SHOW_MOTIF_HANDLING: print('\tP-NODE', *uid, node)
             self.__powernodes[uid].add(node)
+            self.__memberships[node].add(uid)
+            added_nodes.add(node)
             if not const.COVERED_EDGES_FROM_ASP: powernodes.add(uid)
 
         # graph edges reduction and monitoring
         if const.COVERED_EDGES_FROM_ASP:
-            covered = frozenset(motif.edges_covered())
+            covered = motif.edges_covered()
         else:
-            covered = frozenset(motif.edges_covered(self.__powernodes.get(uid, {uid}) for uid in powernodes))
-        nb_edges_before_compress = len(self.__edges)
+            covered = motif.edges_covered(self.__powernodes.get(uid, {uid}) for uid in powernodes)
+        covered = self.__adjacency.pack(covered)  # sorted packed edges
         if const.TEST_INTEGRITY:
-            edges = frozenset(self.__edges)
-            if const.SHOW_DEBUG: print('IFBTVC GRAPH:', self.__edges)
-            if const.SHOW_DEBUG: print('ZEDRBM COVER:', covered)
-        self.__edges -= covered
-        if constants.KEEP_NX_GRAPH:
-            self._nxgraph.remove_edges_from(map(tuple, covered))
-        diff = nb_edges_before_compress - len(covered) != len(self.__edges)
+            edges = self.__adjacency.edge_keys()
+            if const.SHOW_DEBUG: print('IFBTVC GRAPH:', self.__adjacency.unpack(edges))
+            if const.SHOW_DEBUG: print('ZEDRBM COVER:', self.__adjacency.unpack(covered))
+        diff = self.__adjacency.remove_keys(covered) != len(covered)
         if const.TEST_INTEGRITY and diff:
-            diff_cov = covered - edges
-            diff_edg = edges - covered
+            diff_cov = self.__adjacency.unpack(numpy.setdiff1d(covered, edges))
+            diff_edg = self.__adjacency.unpack(numpy.setdiff1d(edges, covered))
             raise ValueError("{} edges yielded by {} searcher were not in the graph: {}.\n\n"
                              "{} edges in the graph were not in the {} searcher: {}."
                              "".format(len(diff_cov), motif.name, ', '.join(map(str, diff_cov)),
@@ -243,36 +379,52 @@ class Graph:
                              "".format(motif.name))
         if const.SHOW_MOTIF_HANDLING:
             print('\tCOVER', len(covered))
+        self.__index.update(added_nodes, self.__adjacency.unpack(covered))
 
         # Now the big part: hierarchy. ASP send patch to apply on it.
         for args in motif.hierachy_added:
             if const.SHOW_MOTIF_HANDLING:
                 print('\tADD HIERARCHY', args)
-            self.__hierarchy.add(args)
+            self.__hierarchy[args] = 'include_block({},{},{},{}).'.format(*args)
             step_parent, num_parent, step_son, num_son = args
+            parent, son = (step_parent, num_parent), (step_son, num_son)
+            self.__pnode_parent[son] = parent
             # nodes in the parent block must be moved to the new block.
             # without that, the node would be at the same time in two powernodes.
-            nodes = self.__powernodes[step_parent, num_parent] & self.__powernodes[step_son, num_son]
+            # Only the nodes just put in a new powernode can be in both.
+            nodes = {node for node in added_nodes if {parent, son} <= self.__memberships[node]}
             if nodes:
-                self.__powernodes[step_parent, num_parent] -= nodes
-                self.__powernodes[step_son, num_son] |= nodes
+                self.__powernodes[parent] -= nodes
+                self.__powernodes[son] |= nodes
+                for node in nodes:
+                    self.__memberships[node].discard(parent)
                 if const.SHOW_MOTIF_HANDLING:
                     print('\tMOVE NODES: {} FROM {} TO {}'.format(nodes, (step_parent, num_parent), (step_son, num_son)))
 
         for args in motif.hierachy_removed:
             if const.SHOW_MOTIF_HANDLING:
                 print('\tDEL HIERARCHY', args)
-            self.__hierarchy.remove(args)
-
-        # Checking that the total number of nodes didn't change,
-        #  i.e. there is no node placed in two powernodes,
-        #  would be a great idea, but there is no way to do that since there is
-        #  no way to know how many nodes are on ground (not in any powernode)
-        #  without using the self.__powernodes attribute.
-        # import itertools
-        # nb_nodes_in_pnodes = sum(1 for _ in itertools.chain.from_iterable(self.__powernodes.values()))
-        # nb_nodes_in_ground = ...
-        # assert nb_nodes_in_pnodes == self.nb_node, (nb_nodes_in_pnodes, self.nb_node)
+            del self.__hierarchy[args]
+            step_parent, num_parent, step_son, num_son = args
+            if self.__pnode_parent.get((step_son, num_son)) == (step_parent, num_parent):
+                del self.__pnode_parent[step_son, num_son]
+
+        # Closure of the blocks: the new powernodes contain their nodes
+        #  and those of the powernodes they contain. Nodes only gain
+        #  containing powernodes, so existing block atoms stay true.
+        new_powernodes = {(motif.uid, numset) for numset, _ in motif.new_powernodes}
+        for uid in new_powernodes:
+            closure = set(self.__powernodes[uid])
+            for stepa, seta, stepb, setb in motif.hierachy_added:
+                if (stepa, seta) == uid:
+                    closure |= self.__closure[stepb, setb]
+            ancestor = uid  # the parents are expected to already contain all the nodes
+            while ancestor is not None and not closure <= self.__closure[ancestor]:
+                for node in closure - self.__closure[ancestor]:
+                    self.__block_atoms[(*ancestor, node)] = 'block({},{},{}).'.format(*ancestor, node)
+                self.__closure[ancestor] |= closure
+                ancestor = self.__pnode_parent.get(ancestor)
+
         if const.SHOW_DEBUG:
             print('PNODES:')
             pprint(dict(self.__powernodes))
@@ -280,6 +432,17 @@ class Graph:
             pprint(dict(self.__poweredges))
 
         if const.TEST_INTEGRITY:
+            assert len(self.__block_atoms) == sum(map(len, self.__closure.values())), "block atoms are not up to date"
+            # the bounds data updated for some nodes are those of the whole graph
+            fresh = NodeIndex(self.__adjacency, free=numpy.array([not self.__memberships[node] for node in range(self.__nb_node)], dtype=bool))
+            assert (fresh.free == self.__index.free).all(), "free nodes are not up to date"
+            assert (fresh.free_degrees == self.__index.free_degrees).all(), "free degrees are not up to date"
+            assert (fresh.triangles == self.__index.triangles).all(), "triangles are not up to date"
+            assert fresh.max_shared() == self.__index.max_shared(), "shared neighbors are not up to date"
+            assert fresh.neighborhoods() == self.__index.neighborhoods(), "neighborhoods are not up to date"
+            # no node placed in two powernodes
+            multiple_pnodes = {node: self.__memberships[node] for node in added_nodes if len(self.__memberships[node]) > 1}
+            assert not multiple_pnodes, multiple_pnodes
             inclusions = defaultdict(set)
             for stp, nsp, sts, nss in self.__hierarchy:
                 inclusions[stp, nsp].add((sts, nss))
@@ -311,7 +474,42 @@ class Graph:
         return self.__uid
     @property
     def nb_edge(self) -> int:
-        return len(self.__edges)
+        return self.__adjacency.nb_edge
+    @property
+    def degrees(self) -> 'numpy.ndarray':
+        """Read-only array node -> number of edges remaining on it"""
+        return self.__adjacency.degrees
+    def adjacency(self) -> dict:
+        """Return the dict node -> frozenset of neighbors of edges remaining in the graph"""
+        return self.__index.neighborhoods()
+    @property
+    def index(self) -> NodeIndex:
+        """Data about each node, kept up to date with the compression"""
+        return self.__index
+    @property
+    def version(self) -> int:
+        """Number of compressions applied, identifying the state of the index"""
+        return self.__index.version
+    def max_common_neighbors(self) -> int:
+        """Maximal number of neighbors shared by two nodes, computed once
+        for the remaining edges whatever the number of searchers asking"""
+        if self.__common_neighbors[0] != self.version:
+            self.__common_neighbors = self.version, self.__adjacency.max_common_neighbors()
+        return self.__common_neighbors[1]
+    def greedy_biclique_score(self, max_size:int) -> int:
+        """Score of a biclique having up to max_size nodes in one set, found greedily
+        within BICLIQUE_LOWERBOUND_TIME_BUDGET (see Adjacency.greedy_biclique_score)"""
+        if self.__biclique_score[0] != (self.version, max_size):
+            budget = const.BICLIQUE_LOWERBOUND_TIME_BUDGET
+            deadline = utils.get_time() + budget if budget else None
+            self.__biclique_score = (self.version, max_size), self.__adjacency.greedy_biclique_score(max_size, deadline)
+        return self.__biclique_score[1]
+    def core_numbers(self) -> 'numpy.ndarray':
+        """Array node -> core number in the remaining edges,
+        computed once per version of the index"""
+        if self.__core_numbers[0] != self.version:
+            self.__core_numbers = self.version, self.__adjacency.core_numbers()
+        return self.__core_numbers[1]
     @property
     def nb_node(self) -> int:
         return self.__nb_node
@@ -320,7 +518,7 @@ class Graph:
         return self.__nb_cc
     def neighbors(self, increasing_degree:bool=False,
                   nb_edges_between_neighbors:bool=False) -> iter:
-        """Yield pairs (node, {neighbor}).
+        """Yield pairs (node, {neighbor}) for the edges remaining in the graph.
 
         increasing_degree -- yield the pairs sorted
         nb_edges_between_neighbors -- yield (node, {neighbors}, N), with N the
@@ -328,12 +526,12 @@ class Graph:
 
         """
         def yield_data():
-            for node, neighbors in self._nxgraph.adjacency():
-                neighbors = tuple(neighbors)
+            for node in range(self.__nb_node):
+                neighbors = self.__adjacency.neighbors(node)
                 if nb_edges_between_neighbors:
-                    yield node, neighbors, self._nxgraph.subgraph(neighbors).size()
+                    yield node, tuple(neighbors.tolist()), int(self.__index.triangles[node])
                 else:
-                    yield node, neighbors
+                    yield node, tuple(neighbors.tolist())
         if increasing_degree:
             data = sorted(tuple(yield_data()), key=lambda x: len(x[1]))
         else:
@@ -349,11 +547,11 @@ class Graph:
             print('PNODES:')
             pprint(dict(self.__powernodes))
             print('HIERAC:')
-            pprint(self.__hierarchy)
+            pprint(set(self.__hierarchy))
             print('PEDGES:')
             pprint(dict(self.__poweredges))
             print(' EDGES:')
-            pprint(self.__edges)
+            pprint(tuple(self.__adjacency.edges()))
 
 
         with open(filename, 'w') as fd:
@@ -365,7 +563,8 @@ class Graph:
         """Yield lines of bubble representation"""
         if head_comment:
             yield from ('# ' + line for line in head_comment.splitlines(False))
-        _format_name = lambda x: format_name(format_name(None, self.uid), x)
+        # nodes are given by their id, powernodes by their (step, set)
+        _format_name = lambda x: format_name(format_name(None, self.uid), self.__names[x] if isinstance(x, int) else x)
         if const.BUBBLE_EMBEDS_CC:  # add a powernode embedding all the graph
             embedding_pnode = 'CC-{}'.format(self.uid)
             if given_uid: embedding_pnode += ' ({})'.format(given_uid)
@@ -398,7 +597,7 @@ class Graph:
 
         if not const.BUBBLE_WITH_SIMPLE_EDGES:
             return  # do not yield the simple edges
-        for source, target in self.__edges:
+        for source, target in self.__adjacency.edges():
             source, target = sorted(tuple(map(_format_name, (source, target))))
             yield 'EDGE\t{}\t{}\t{}'.format(source, target, constants.BUBBLE_EDGE_FACTOR)
 
@@ -101,13 +101,16 @@ class Motif:
 
 
     def edges_covered(self, sets:[frozenset]=None) -> iter:
-        """If sets are given, the computation of edges covered by the motif
+        """Yield the edges covered by the motif, as pairs of nodes,
+        possibly repeated or in both directions.
+
+        If sets are given, the computation of edges covered by the motif
         is delegated to the searcher object.
 
         This allow to avoid a costly output from ASP.
 
         """
         if sets:  # give that to the searcher
-            yield from frozenset(self.type.covered_edges(tuple(sets)))
+            yield from self.type.covered_edges(tuple(sets))
         else:  # ASP provide us with the data
-            yield from map(frozenset, self.atoms.get('covered_edge', ()))
+            yield from self.atoms.get('covered_edge', ())
@@ -4,22 +4,58 @@ Offers an API useful for compression routine (access to score),
 internal integrity test (equivalency of all contained motifs),
 and non-overlapping subset selection.
 
+Motifs are selected while they are given by the solver: only those
+not overlapping the already selected ones are kept, and the enumeration
+is stopped once no other motif can be selected.
+
 """
 
 from itertools import islice
 from powergrasp.motif import Motif
-from powergrasp.constants import TEST_INTEGRITY
+from powergrasp.constants import TEST_INTEGRITY, MULTISHOT_MOTIF_LIMIT
 
 
 class MotifBatch:
-    """Container of Motif"""
+    """Container of non-overlapping Motif.
+
+    motifs -- iterable of motifs of same score, consumed only as needed.
+    graph -- the Graph the motifs are found in. If given, the enumeration stops
+             once the remaining edges not touching selected motifs can't
+             make another motif of the same score.
+    limit -- maximal number of motifs to select. Zero for no limit.
 
-    def __init__(self, motifs:iter):
-        self.motifs = tuple(motifs)
+    """
+
+    def __init__(self, motifs:iter, graph:object=None, limit:int=MULTISHOT_MOTIF_LIMIT):
+        self.motifs = tuple(self._selected(iter(motifs), graph, limit))
         self.score = self.motifs[0].score if self.motifs else None
-        if TEST_INTEGRITY and self.score:
-            scores = set(m.score for m in self.motifs)
-            assert len(scores) == 1, "Multiple different scores in motifs: " + str(scores)
+
+    @staticmethod
+    def _selected(motifs:iter, graph:object, limit:int) -> iter:
+        """Yield motifs that are non overlapping between them, and stop
+        the enumeration when no other motif can be selected"""
+        first = next(motifs, None)
+        if first is None: return  # nothing to yield
+        score, used_nodes = first.score, frozenset(first.new_nodes)
+        yield first
+        nb_selected = 1
+        if graph is not None:
+            adjacency = graph.adjacency()
+            free_edges = graph.nb_edge - _nb_edges_touching(used_nodes, frozenset(), adjacency)
+        while (not limit or nb_selected < limit) and (graph is None or free_edges >= score):
+            motif = next(motifs, None)
+            if motif is None: break  # enumeration is over
+            if TEST_INTEGRITY:
+                assert motif.score == score, "Multiple different scores in motifs: " + str({score, motif.score})
+            motif_nodes = frozenset(motif.new_nodes)
+            if motif_nodes.isdisjoint(used_nodes):
+                if graph is not None:
+                    free_edges -= _nb_edges_touching(motif_nodes, used_nodes, adjacency)
+                used_nodes |= motif_nodes
+                nb_selected += 1
+                yield motif
+        if hasattr(motifs, 'close'):
+            motifs.close()  # stop the enumeration
 
     def __bool__(self) -> bool:
         return bool(self.motifs)
@@ -42,13 +78,20 @@ class MotifBatch:
         do not share any node.
 
         """
-        if self.empty: return  # nothing to yield
-        motifs = iter(self.motifs)
-        first = next(motifs)
-        nodes = frozenset(first.new_nodes)
-        yield first
-        for motif in motifs:
-            motif_nodes = frozenset(motif.new_nodes)
-            if motif_nodes.isdisjoint(nodes):
-                nodes |= motif_nodes
-                yield motif
+        yield from self.motifs
+
+
+def _nb_edges_touching(nodes:frozenset, excluded_nodes:frozenset, adjacency:dict) -> int:
+    """Return the number of edges having an end in given nodes, and none in excluded nodes
+
+    >>> adjacency = {1: {2, 3}, 2: {1, 3}, 3: {1, 2, 4}, 4: {3}}
+    >>> _nb_edges_touching(frozenset({1, 2}), frozenset(), adjacency)
+    3
+    >>> _nb_edges_touching(frozenset({3}), frozenset({1}), adjacency)
+    2
+
+    """
+    inner = sum(1 for node in nodes for nei in adjacency.get(node, ()) if nei in nodes) // 2
+    outer = sum(1 for node in nodes for nei in adjacency.get(node, ())
+                if nei not in nodes and nei not in excluded_nodes)
+    return inner + outer
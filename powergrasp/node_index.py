@@ -0,0 +1,125 @@
+"""Data about each node of the remaining graph, from which searchers
+derive their bounds after each compression.
+
+A compression only removes edges and puts nodes in powernodes,
+so all the data only decrease: Graph.compress updates them
+for the nodes near the compressed motif only.
+
+"""
+
+import numpy
+from powergrasp.adjacency import Adjacency
+
+
+class NodeIndex:
+    """Data of each node of given adjacency, shared by the searchers
+    and the edge filtering:
+
+    version -- number of updates, i.e. of compressions
+    free -- True if the node is in no powernode. A set of free nodes never
+            overlaps a block, so it is a valid set for any motif.
+    free_degrees -- number of free neighbors
+    triangles -- number of edges between the neighbors
+    shared -- max number of free neighbors shared with another free node,
+              0 if not free. Exact only where shared_exact is set,
+              an upperbound elsewhere, computed when needed by max_shared.
+
+    >>> adj = Adjacency(5, [(0, 2), (0, 3), (1, 2), (1, 3), (2, 3), (3, 4)])
+    >>> index = NodeIndex(adj)
+    >>> index.max_shared(), index.max_free_degree(), index.triangles.tolist()
+    (2, 4, [1, 1, 2, 2, 0])
+    >>> adj.remove_edges([(0, 2), (1, 2)])
+    2
+    >>> index.update(nodes=[0, 1], edges=[(0, 2), (1, 2)])
+    >>> index.max_shared(), index.max_free_degree(), index.triangles.tolist()
+    (1, 2, [0, 0, 0, 0, 0])
+    >>> index.version, sorted(index.neighborhoods()[2])
+    (1, [3])
+
+    """
+
+    def __init__(self, adjacency:Adjacency, free:numpy.ndarray=None):
+        self.adjacency = adjacency
+        self.version = 0
+        self._neighborhoods = None  # built only if needed
+        if free is None:  # no powernode yet
+            self.free = numpy.ones(adjacency.nb_node, dtype=bool)
+            self.free_degrees = adjacency.degrees.astype(numpy.int64)
+        else:
+            self.free = free
+            self.free_degrees = numpy.array([numpy.count_nonzero(free[adjacency.neighbors(node)])
+                                             for node in range(adjacency.nb_node)], dtype=numpy.int64)
+        self.triangles = adjacency.triangles()
+        self.shared = numpy.where(self.free, adjacency.degrees, 0).astype(numpy.int64)
+        self.shared_exact = ~self.free
+
+    def update(self, nodes:iter, edges:iter):
+        """Update the data after given nodes were put in powernodes,
+        and given edges, as pairs of nodes, were removed from the adjacency"""
+        adjacency = self.adjacency
+        nodes = numpy.fromiter(nodes, dtype=numpy.int64)
+        newly = nodes[self.free[nodes]]
+        self.free[newly] = False
+        ends = numpy.unique(numpy.array(list(edges), dtype=numpy.int64).reshape(-1))
+        indptr, indices = adjacency.remaining_csr()
+        around_ends = numpy.union1d(ends, Adjacency.gather_rows(ends, indptr, indices))
+        # free degrees change on the ends of removed edges, and around new non-free nodes
+        changed = numpy.union1d(ends, Adjacency.gather_rows(newly, indptr, indices))
+        self.free_degrees[changed] = [numpy.count_nonzero(self.free[adjacency.neighbors(node)]) for node in changed.tolist()]
+        # triangles change on the ends, and their common neighbors
+        self.triangles[around_ends] = [adjacency.nb_edges_among(adjacency.neighbors(node)) for node in around_ends.tolist()]
+        # shared neighbors change up to two nodes away from the ends and new non-free nodes
+        changed = numpy.union1d(ends, newly)
+        changed = numpy.union1d(changed, Adjacency.gather_rows(changed, indptr, indices))
+        changed = numpy.union1d(changed, Adjacency.gather_rows(changed, indptr, indices))
+        self.shared_exact[changed] = False
+        self.shared[~self.free] = 0
+        self.shared_exact[~self.free] = True
+        if self._neighborhoods is not None:
+            for node in ends.tolist():
+                if adjacency.degrees[node]:
+                    self._neighborhoods[node] = frozenset(adjacency.neighbors(node).tolist())
+                else:
+                    self._neighborhoods.pop(node, None)
+        self.version += 1
+
+    @property
+    def degrees(self) -> numpy.ndarray:
+        """Read-only array node -> number of edges remaining on it"""
+        return self.adjacency.degrees
+
+    def neighborhoods(self) -> dict:
+        """Return the dict node -> frozenset of neighbors, for nodes having
+        remaining edges. Built once, then updated with the index."""
+        if self._neighborhoods is None:
+            self._neighborhoods = {node: frozenset(self.adjacency.neighbors(node).tolist())
+                                   for node in self.degrees.nonzero()[0].tolist()}
+        return self._neighborhoods
+
+    def max_free_degree(self) -> int:
+        """Number of leaves of the biggest star having only free leaves"""
+        return int(self.free_degrees.max(initial=0))
+
+    def max_shared(self) -> int:
+        """Max number of free neighbors shared by two free nodes.
+
+        Nodes are visited by decreasing shared value, computing it where
+        it is not exact, until the current best can't be beaten.
+
+        """
+        adjacency = self.adjacency
+        indptr, indices = None, None  # built only if needed
+        best = 0
+        for node in numpy.argsort(-self.shared, kind='stable').tolist():
+            if self.shared[node] <= best:
+                break
+            if not self.shared_exact[node]:
+                if indptr is None:
+                    indptr, indices = adjacency.remaining_csr()
+                neighbors = adjacency.neighbors(node)
+                others = Adjacency.gather_rows(neighbors[self.free[neighbors]], indptr, indices)
+                others = others[self.free[others] & (others != node)]
+                self.shared[node] = int(numpy.bincount(others).max()) if len(others) else 0
+                self.shared_exact[node] = True
+            best = max(best, int(self.shared[node]))
+        return best
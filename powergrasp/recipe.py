@@ -115,7 +115,6 @@ class RecipeEntry:
     @property
     def covered_edges(self) -> {frozenset((str, str))}:
         "Return edges covered by the recipe"
-        quoted = lambda a: '"' + a + '"'
         return frozenset(map(frozenset, itertools.product(map(quoted, self.seta), map(quoted, self.setb))))
 
     def __iter__(self):
@@ -124,16 +123,20 @@ class RecipeEntry:
     def __str__(self):
         return f"<RecipeEntry for {','.join(self.typenames)} with {{{','.join(self.seta)}}}×{{{','.join(self.setb)}}}>"
 
-    def as_asp(self, is_star:bool):
-        """Return ASP atoms translating the given recipe line"""
+    def as_asp(self, is_star:bool, node_id:callable=lambda name: name):
+        """Return ASP atoms translating the given recipe line.
+
+        node_id -- function giving the node, as known by ASP, of given quoted node name.
+
+        """
         typenames, seta, setb = self
         if min(setb) < min(seta):  # minimal element must be in seta
             setb, seta = seta, setb
         if is_star and len(seta) == 1:  # if it's a star, then single element must be in setb
             setb, seta = seta, setb
         return '\n'.join((
-            ' '.join(f'newconcept(1,"{element}").' for element in seta),
-            '' if self.is_clique else ' '.join(f'newconcept(2,"{element}").' for element in setb),
+            ' '.join(f'newconcept(1,{node_id(quoted(element))}).' for element in seta),
+            '' if self.is_clique else ' '.join(f'newconcept(2,{node_id(quoted(element))}).' for element in setb),
             # '|'.join(typenames) + '.'
         ))
 
@@ -146,3 +149,13 @@ class RecipeEntry:
         if searcher.name == 'star':
             return self.is_star
         return searcher.motif_name in self.typenames
+
+
+def quoted(name:str) -> str:
+    """Return given node name as found in graphs
+
+    >>> quoted('a')
+    '"a"'
+
+    """
+    return '"' + name + '"'
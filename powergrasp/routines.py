@@ -2,12 +2,16 @@
 
 """
 
+import os
 import csv
-from .searchers import CliqueSearcher, BicliqueSearcher, StarSearcher, NonStarBicliqueSearcher, QuasiBicliqueSearcher, TripletSearcher
+import threading
+from .searchers import ALL_ASP_FILES, CliqueSearcher, BicliqueSearcher, StarSearcher, NonStarBicliqueSearcher, QuasiBicliqueSearcher, TripletSearcher
 from .utils import get_time
 from .graph import Graph
 from .recipe import Recipe
+from .checkpoint import Checkpoint
 from . import constants as const
+from .asp import ENCODINGS
 from .constants import MULTISHOT_MOTIF_SEARCH, BUBBLE_FOR_EACH_STEP, TIMERS, SHOW_STORY, SHOW_DEBUG, STATISTIC_FILE, USE_STAR_MOTIF, ONLY_BICLIQUES, QUASIBICLIQUES, TRIPLETS, ONLY_TRIPLETS
 from .motif_batch import MotifBatch
 from multiprocessing.dummy import Pool as ThreadPool  # dummy here to use the threading backend, not process
@@ -22,6 +26,10 @@ if TIMERS and STATISTIC_FILE:
             fd.write(','.join(map(str, args)) + '\n')
 
 
+# searches may be stopped by time budgets
+WITH_TIME_BUDGETS = bool(const.CC_TIME_BUDGET) or any(budget is not None for budget in const.SEARCH_TIME_BUDGET.values())
+
+
 def search_best_motifs_sequentially(searchers, step, recipe) -> MotifBatch:
     """Return a MotifBatch instance containing the best motifs
     found by given searchers."""
@@ -32,7 +40,7 @@ def search_best_motifs_sequentially(searchers, step, recipe) -> MotifBatch:
         if recipe and not recipe.accept(searcher):
             print(f'Recipe {recipe} cannot be fulfilled with searcher {searcher.name}')
             continue
-        motifs = MotifBatch(searcher.search(step, score_to_beat, recipe=recipe))
+        motifs = MotifBatch(searcher.search(step, score_to_beat, recipe=recipe), searcher.graph)
         if motifs:
             searcher.on_new_found_motif(motifs)
             if motifs.score > best_motifs_score:
@@ -42,11 +50,46 @@ def search_best_motifs_sequentially(searchers, step, recipe) -> MotifBatch:
 
 def search_best_motifs_in_parallel(searchers, step, recipe) -> MotifBatch:
     """Return a MotifBatch instance containing the best motifs
-    found by given searchers."""
-    with ThreadPool(len(searchers)) as pool:
-        founds = pool.starmap(search_best_motifs_sequentially, (([s], step, recipe) for s in searchers))
+    found by given searchers.
+
+    Searchers share the best score found so far: a search starts with it
+    as score to beat, and is cancelled once it can't beat it anymore.
+    No more searches than CPUs are run at the same time, so a search
+    waiting for a CPU starts with the score of those already done.
+
+    """
+    best_score = LiveScore()
+    def search_with(searcher):
+        if recipe and not recipe.accept(searcher):
+            print(f'Recipe {recipe} cannot be fulfilled with searcher {searcher.name}')
+            return None
+        motifs = MotifBatch(searcher.search(step, best_score(), recipe=recipe, best_score=best_score), searcher.graph)
+        if motifs:
+            searcher.on_new_found_motif(motifs)
+            best_score.update(motifs.score)
+            return motifs
+    ordered_searchers = tuple(const.MOTIF_TYPE_ORDER(searchers))
+    with ThreadPool(min(len(ordered_searchers), os.cpu_count() or 1)) as pool:
+        founds = pool.map(search_with, ordered_searchers, chunksize=1)
     return max(founds, key=lambda f: 0 if f is None else f.score)
 
+
+class LiveScore:
+    """Best score found so far by searchers running concurrently.
+    Calling it gives the score."""
+
+    def __init__(self):
+        self._score = 0
+        self._lock = threading.Lock()
+
+    def __call__(self) -> int:
+        return self._score
+
+    def update(self, score:int):
+        """Take given score into account"""
+        with self._lock:
+            self._score = max(self._score, score)
+
 if const.PARALLEL_MOTIF_SEARCH:
     search_best_motifs = search_best_motifs_in_parallel
 else:
@@ -72,24 +115,43 @@ def create_searchers(graph):
     return searchers
 
 
-def compress(graph:Graph, *, cc_idx=None, recipe:[Recipe]=None) -> [str]:
-    """Yield bubble lines found in graph"""
+def compress(graph:Graph, *, cc_idx=None, recipe:[Recipe]=None, resume:bool=False) -> [str]:
+    """Yield bubble lines found in graph
+
+    resume -- start from the last checkpoint of the cc, if any
+
+    """
     if TIMERS:
         timer_start = get_time()
         timer_last = timer_start
+        cache_saved_start = ENCODINGS.time_saved
     searchers = create_searchers(graph)
     if SHOW_STORY:
         print('INFO searchers: ' + ', '.join(s.name for s in searchers))
         print(f"INFO recipe: {recipe}")
     recipe_lines, recipe_line, recipe_completed = iter(recipe or ()), None, False
-    step = 0
-    complete_compression = False
-    while True:
+    step, nb_recipe_line = 0, 0
+    complete_compression, finished = False, False
+    checkpoint = Checkpoint(graph, cc_idx) if const.CHECKPOINT_DIR and cc_idx else None
+    progress = checkpoint.restore(graph, searchers) if checkpoint and resume else None
+    if progress:
+        step, complete_compression, finished = progress['step'], progress['complete'], progress['finished']
+        for _ in range(progress['nb_recipe_line']):
+            recipe_line = next(recipe_lines, None)
+        nb_recipe_line, recipe_completed = progress['nb_recipe_line'], progress['recipe_completed']
+        if SHOW_STORY:
+            print('INFO compression resumed at step {} from {}'.format(step, checkpoint.filename))
+    def save_checkpoint(step, nb_recipe_line, recipe_completed):
+        checkpoint.save(graph, searchers, step=step, nb_recipe_line=nb_recipe_line, recipe_completed=recipe_completed,
+                        complete=complete_compression, finished=finished)
+    while not finished:
+        before_step = step, nb_recipe_line, recipe_completed  # progress to save if the step is interrupted
         if recipe_line and recipe_line.isbreakable and not recipe_completed:
             pass  # reuse the same recipe line
         else:  # everything normal
             recipe_line = next(recipe_lines, None)
             recipe_completed = False
+            nb_recipe_line += 1
         if (SHOW_STORY and recipe_line) or SHOW_DEBUG: print('INFO recipe:', recipe_line)
         step += 1
         try:
@@ -97,6 +159,8 @@ def compress(graph:Graph, *, cc_idx=None, recipe:[Recipe]=None) -> [str]:
         except KeyboardInterrupt:
             print('WARNING interrupted search. Graph compression aborted. Output will be written.')
             best_motifs = None
+            if checkpoint:
+                save_checkpoint(*before_step)
             break
         if best_motifs:  # let's compress it
             step += graph.compress_all(best_motifs.non_overlapping_subset())
@@ -122,7 +186,16 @@ def compress(graph:Graph, *, cc_idx=None, recipe:[Recipe]=None) -> [str]:
                 ]
                 if not TIMERS:
                     timers = 'none', 'none'
+                if WITH_TIME_BUDGETS:
+                    bounds += ['{}:{}'.format(searcher.name, searcher.budget_hits) for searcher in searchers]
                 save_stats(cc_idx, *timers, best_motifs.name, best_motifs.score, *bounds)
+            if checkpoint and checkpoint.is_due(step):
+                save_checkpoint(step, nb_recipe_line, recipe_completed)
+        elif any(searcher.last_search_stopped for searcher in searchers):
+            print('WARNING no motif found before the end of time budget. Graph compression stopped.')
+            if checkpoint:
+                save_checkpoint(*before_step)
+            break
         else:
             if recipe_line:  # the recipe failed, or is optional
                 recipe_completed = True
@@ -135,11 +208,12 @@ def compress(graph:Graph, *, cc_idx=None, recipe:[Recipe]=None) -> [str]:
                     if SHOW_STORY:
                         print(f"INFO optional recipe {recipe_line} failed.")
             else:  # no recipe, so it's a normal ending of compression
-                complete_compression = True
-                break  # nothing to compress
+                complete_compression = finished = True
         # finish compression if the recipe asks so (and is not an uncompleted breakable).
         if recipe_line and recipe_line.islast and not (recipe_line.isbreakable and not recipe_completed):
-            break
+            finished = True
+        if finished and checkpoint:
+            save_checkpoint(step, nb_recipe_line, recipe_completed)
     if TIMERS:
         timer_output = get_time()
 
@@ -159,10 +233,16 @@ def compress(graph:Graph, *, cc_idx=None, recipe:[Recipe]=None) -> [str]:
 
     # compute the statistics
     compression_statistics = tuple(graph.compression_metrics())
+    if WITH_TIME_BUDGETS:
+        budget_hits = sum(searcher.budget_hits for searcher in searchers)
+        compression_statistics = (*compression_statistics, ('searches stopped by time budget', budget_hits))
     if cc_idx:
         compression_statistics = (('connected component', cc_idx), *compression_statistics)
     if TIMERS:
         compression_statistics = (*compression_statistics, ('time since start', timers[0]))
+        if const.CLINGO_BACKEND == 'module':
+            cache_saved = round(ENCODINGS.time_saved - cache_saved_start, 2)
+            compression_statistics = (*compression_statistics, ('time saved by encoding cache', cache_saved))
     # write the statistics where available
     if const.CC_STATISTIC_FILE and cc_idx:
         with open(const.CC_STATISTIC_FILE, 'a') as fd:
@@ -171,10 +251,11 @@ def compress(graph:Graph, *, cc_idx=None, recipe:[Recipe]=None) -> [str]:
         yield from _gen_metrics(compression_statistics)
 
 
-def compress_by_cc(fname:str, recipe_files:[str]=None) -> [str]:
+def compress_by_cc(fname:str, recipe_files:[str]=None, resume:bool=False) -> [str]:
     """Yield bubble lines from compression of each cc found in given filename
 
     recipe_files -- iterable of filenames or raw recipe, or Recipe objects
+    resume -- start each cc from its last checkpoint, if any
 
     """
     if TIMERS and const.BUBBLE_WITH_STATISTICS:
@@ -192,23 +273,33 @@ def compress_by_cc(fname:str, recipe_files:[str]=None) -> [str]:
     else:
         def recipe_for(*_, **__): return None  # no recipe available
 
-    graphs = enumerate(Graph.ccs_from_file(fname), start=1)
+    graphs = enumerate(Graph.ccs_from_file(fname, chunk_size=const.STREAMING_CHUNK_SIZE), start=1)
     stats = None
     if const.PARALLEL_CC_COMPRESSION == 1:  # simple case, allowing for global stats
         for idx, graph in graphs:
             if idx > 1:  yield ''
             yield '# CONNECTED COMPONENT {}'.format(idx)
-            yield from compress(graph, cc_idx=idx, recipe=recipe_for(graph))
+            yield from compress(graph, cc_idx=idx, recipe=recipe_for(graph), resume=resume)
             if const.GLOBAL_STATISTICS:
                 stats = _build_global_stats(stats, graph.compression_metrics_data())
     else:  # many processes imply a more complex system
         nb_process = const.PARALLEL_CC_COMPRESSION
-        if nb_process == 0:
-            graphs = ((idx, gr, recipe_for(gr)) for idx, gr in graphs)
+        graphs = ((idx, gr, recipe_for(gr), resume) for idx, gr in graphs)
+        if nb_process == 0 and const.STREAMING_CHUNK_SIZE:
+            nb_process = os.cpu_count() or 1  # ccs are not counted, to not hold them all
+        elif nb_process == 0:
             graphs = tuple(graphs)  # RIP memory
-            nb_process = len(graphs) or 1
-        with ProcessPool(nb_process) as pool:
-            for lines, stats_data in pool.starmap(_func_on_graph, graphs):
+            # no need for more workers than cpu, since they are reused from one cc to another
+            nb_process = min(len(graphs), os.cpu_count() or 1) or 1
+        with ProcessPool(nb_process, initializer=_init_worker) as pool:
+            if const.STREAMING_CHUNK_SIZE:  # only build the ccs the workers are about to get
+                slots = threading.Semaphore(2 * nb_process)
+                results = pool.imap(_func_on_graph_args, _throttled(graphs, slots))
+            else:
+                results = pool.starmap(_func_on_graph, graphs)
+            for lines, stats_data in results:
+                if const.STREAMING_CHUNK_SIZE:
+                    slots.release()
                 yield from lines
                 if const.GLOBAL_STATISTICS:
                     stats = _build_global_stats(stats, stats_data)
@@ -221,16 +312,40 @@ def compress_by_cc(fname:str, recipe_files:[str]=None) -> [str]:
         yield '# total compression time: {}'.format(round(get_time() - timer, 2))
 
 
-def _func_on_graph(idx, graph, recipe):
+def _init_worker():
+    """Prepare a compression worker before it receives its first cc.
+
+    Workers are reused from one cc to another. With the module backend,
+    the encodings are parsed here once for all of them.
+
+    """
+    if const.CLINGO_BACKEND == 'module':
+        for files in ALL_ASP_FILES:
+            ENCODINGS.prepare(files)
+
+
+def _func_on_graph(idx, graph, recipe, resume=False):
     """Function used by multiprocessing compression of cc. Needs to be global
     to be pickled."""
     lines = (
         '# CONNECTED COMPONENT {}'.format(idx),
-        *compress(graph, cc_idx=idx, recipe=recipe)
+        *compress(graph, cc_idx=idx, recipe=recipe, resume=resume)
     )
     return lines, graph.compression_metrics_data()
 
 
+def _func_on_graph_args(args:tuple):
+    """Same as _func_on_graph, for pool methods giving only one argument"""
+    return _func_on_graph(*args)
+
+
+def _throttled(iterable:iter, slots:threading.Semaphore) -> iter:
+    """Yield elements of given iterable, each one once a slot is acquired"""
+    for element in iterable:
+        slots.acquire()
+        yield element
+
+
 def _build_global_stats(prev:tuple, current:tuple):
     """Return the addition of previous and current statistics values"""
     if prev is None:
@@ -1,5 +1,6 @@
 
 import math
+import numpy
 import itertools
 from collections import defaultdict
 
@@ -9,9 +10,12 @@ from .utils import get_time
 from .motif import Motif
 from .graph import Graph
 from .recipe import RecipeEntry
+from .adaptive import history_for
 from .constants import (TEST_INTEGRITY, SHOW_STORY, SHOW_DEBUG, KEEP_SINGLE_NODES,
                         MULTISHOT_MOTIF_SEARCH, BICLIQUE_LOWERBOUND_MAXNEI,
-                        OPTIMIZE_FOR_MEMORY, CLINGO_OPTIONS, QUASIBICLIQUE_MU)
+                        OPTIMIZE_FOR_MEMORY, CLINGO_OPTIONS, QUASIBICLIQUE_MU,
+                        SEARCH_TIME_BUDGET, CC_TIME_BUDGET,
+                        CLINGO_PORTFOLIO, CLINGO_ADAPTIVE_OPTIONS)
 from . import ASP_FILES
 
 MOTIF_ASP_FILES = ASP_FILES['process-motif'], ASP_FILES['scoring_powergraph'], (ASP_FILES['block-constraint-memory'] if OPTIMIZE_FOR_MEMORY else ASP_FILES['block-constraint-cpu'])
@@ -21,6 +25,46 @@ BICLIQUE_ASP_FILES = (ASP_FILES['search-biclique'], *MOTIF_ASP_FILES)
 QUASIBICLIQUE_ASP_FILES = (ASP_FILES['search-quasibiclique'], *MOTIF_ASP_FILES)
 STAR_ASP_FILES = (ASP_FILES['search-star'], *MOTIF_ASP_FILES)
 TRIPLET_ASP_FILES = (ASP_FILES['search-triplet'], *MOTIF_ASP_FILES)
+ALL_ASP_FILES = (CLIQUE_ASP_FILES, FULLBICLIQUE_ASP_FILES, BICLIQUE_ASP_FILES,
+                 QUASIBICLIQUE_ASP_FILES, STAR_ASP_FILES, TRIPLET_ASP_FILES)
+
+
+def degrees_upperbound(degrees:numpy.ndarray) -> int or float:
+    """Maximal score of a biclique between the most connected nodes,
+    i.e. max of i * d over the i nodes of degree at least d > 1.
+    Infinite if there is no such node.
+
+    >>> degrees_upperbound(numpy.array([1, 3, 2, 3, 1]))
+    6
+    >>> degrees_upperbound(numpy.array([1, 1]))
+    inf
+
+    """
+    degrees = numpy.sort(degrees)[::-1]
+    degrees = degrees[degrees > 1]
+    if not len(degrees):
+        return math.inf
+    return int((numpy.arange(1, len(degrees) + 1) * degrees).max())
+
+
+def clique_upperbound(cores:numpy.ndarray, triangles:numpy.ndarray) -> int:
+    """Maximal score of a clique, knowing the core number
+    and the number of triangles of each node.
+
+    A node is in no clique of more nodes than its core number plus one,
+    nor than utils.maximal_clique_size of its triangles. A clique of k nodes
+    needing k such nodes, k is the biggest number of nodes each allowing k.
+
+    >>> clique_upperbound(numpy.array([3, 3, 3, 3, 1, 1]), numpy.array([3, 3, 3, 3, 0, 0]))
+    6
+    >>> clique_upperbound(numpy.array([2, 2, 2, 3, 3]), numpy.array([1, 1, 1, 6, 6]))
+    3
+
+    """
+    sizes = numpy.minimum(cores + 1, [utils.maximal_clique_size(nb_edge) for nb_edge in triangles.tolist()])
+    sizes = numpy.sort(sizes)[::-1]
+    size = int(numpy.count_nonzero(sizes >= numpy.arange(1, len(sizes) + 1)))
+    return (size * (size - 1)) // 2
 
 
 class MotifSearcher:
@@ -41,6 +85,8 @@ class MotifSearcher:
     - name: the name of the motif, human-readable, making it different from the others.
     - _compute_initial_upperbound: give upperbound at first step for given graph (default: number of graph edges)
     - _compute_initial_lowerbound: idem for lowerbound (default: 2)
+    - compute_new_lowerbound: give lowerbound after a compression (default: 2)
+    - compute_new_upperbound: give upperbound after a compression, kept if lower than the current one (default: number of graph edges)
     - _search: called to search a motif in the graph, returns atoms found by ASP solver.
 
     Note that a motif searcher will maintain by itself the lowerbound
@@ -54,6 +100,9 @@ class MotifSearcher:
         self.graph = graph
         self.init_for_graph(graph)
         self.__timer = None
+        self._cc_deadline = get_time() + CC_TIME_BUDGET if CC_TIME_BUDGET else None
+        self._budget = None  # time budget of the current search
+        self.budget_hits = 0  # number of searches stopped by their time budget
 
     def init_for_graph(self, graph:Graph):
         if hasattr(self, 'compute_initial_bounds'):  # all-in-one method
@@ -82,6 +131,8 @@ class MotifSearcher:
         return 2
     def compute_new_lowerbound(self, graph:Graph, motif:Motif) -> int:
         return 2
+    def compute_new_upperbound(self, graph:Graph) -> int:
+        return graph.nb_edge
 
     def on_new_found_motif(self, motif:Motif):
         """How to react when a motif is found ?"""
@@ -91,13 +142,22 @@ class MotifSearcher:
     def on_new_compressed_motif(self, motif:Motif):
         """How to react when a motif is compressed ?"""
         self._lowerbound = self.compute_new_lowerbound(self.graph, motif)
+        self._upperbound = min(self._upperbound, self.compute_new_upperbound(self.graph))
+
+
+    def search(self, step:int, score_to_beat:int=0, recipe:RecipeEntry=None,
+               best_score:callable=None) -> [Motif]:
+        """Search for motifs, better than the one to beat.
 
+        best_score -- function giving the best score found so far by
+                      searchers running concurrently. The search is cancelled
+                      once it can't beat it, and motifs not beating it are dropped.
 
-    def search(self, step:int, score_to_beat:int=0, recipe:RecipeEntry=None) -> [Motif]:
-        """Search for motifs, better than the one to beat."""
+        """
         self.__timer = get_time()
+        self._budget = None
         if recipe and not recipe.isbreakable:
-            supplementary_asp_atoms = recipe.as_asp(is_star=self.name == 'star')
+            supplementary_asp_atoms = recipe.as_asp(is_star=self.name == 'star', node_id=self.graph.node_id)
             lowerbound = sum(1 for _ in self.covered_edges(recipe.sets))
             upperbound = self.upperbound if recipe.isextendable else lowerbound
             if SHOW_DEBUG:
@@ -119,13 +179,42 @@ class MotifSearcher:
                 print("INFO No {} search because of bounds ({};{})."
                       "".format(self.name, lowerbound, upperbound))
             return  # impossible to find a motif in such conditions
+        cancel_when = None if best_score is None else (lambda: best_score() >= upperbound)
+        self._budget = budget = self._time_budget(cancel_when)
+        if budget and budget.seconds is not None and budget.seconds <= 0:
+            if SHOW_STORY:
+                print("INFO No {} search because time budget of cc is exhausted.".format(self.name))
+            budget.exhausted = True
+            return
         models = self._search(step, self.graph.with_recipe(recipe), lowerbound, upperbound, supplementary_asp_atoms)
-        yield from (
-            # the Motif is maximal, unless a recipe was biasing the search
-            Motif(self.name, model, maximal=not recipe, step=step, searcher=self)
-            for model in models
-        )
-        self.__timer = get_time() - self.__timer
+        try:  # models may not be all consumed, when no other motif can be used
+            yield from (
+                # the Motif is maximal, unless a recipe was biasing the search, or the search was stopped early
+                motif for motif in (
+                    Motif(self.name, model, maximal=not recipe and not (budget and budget.exhausted), step=step, searcher=self)
+                    for model in models
+                ) if best_score is None or motif.score > best_score()
+            )
+        finally:
+            if budget and budget.exhausted:
+                self.budget_hits += 1
+            self.__timer = get_time() - self.__timer
+
+    def _time_budget(self, cancel_when:callable=None) -> asp.TimeBudget or None:
+        """Return the time budget for a new search, or None if not limited
+        and not cancellable"""
+        seconds = SEARCH_TIME_BUDGET.get(self.name, SEARCH_TIME_BUDGET[None])
+        if self._cc_deadline is not None:
+            remaining = self._cc_deadline - get_time()
+            seconds = remaining if seconds is None else min(seconds, remaining)
+        if seconds is None and cancel_when is None:
+            return None
+        return asp.TimeBudget(seconds, cancel_when)
+
+    @property
+    def last_search_stopped(self) -> bool:
+        """True if the last search was stopped by its time budget"""
+        return self._budget is not None and self._budget.exhausted
 
     @property
     def last_search_time(self) -> float:
@@ -142,6 +231,44 @@ class MotifSearcher:
     def _clingo_options(self):
         return CLINGO_OPTIONS[None] + ' ' + CLINGO_OPTIONS.get(self.name, '')
 
+    def _solve(self, step:int, lowerbound:int, upperbound:int, files:tuple,
+               atoms:[str], other_atoms:str='', options:str='') -> iter:
+        """Yield models found by the solver for given graph atoms"""
+        options = self._clingo_options() + options
+        portfolio = self._portfolio()
+        candidates = CLINGO_ADAPTIVE_OPTIONS.get(self.name, CLINGO_ADAPTIVE_OPTIONS[None])
+        if candidates and len(portfolio) < 2:  # racing configurations are not chosen
+            history = history_for(self.name, candidates)
+            chosen = history.choose()
+            if SHOW_STORY:
+                print("INFO {} search with adaptive options '{}'".format(self.name, chosen))
+            models = self._solve_with(step, lowerbound, upperbound, files, atoms, other_atoms, options + ' ' + chosen, portfolio)
+            return self._timed_models(models, history, chosen, self.graph.nb_edge)
+        return self._solve_with(step, lowerbound, upperbound, files, atoms, other_atoms, options, portfolio)
+
+    def _solve_with(self, step:int, lowerbound:int, upperbound:int, files:tuple,
+                    atoms:[str], other_atoms:str, options:str, portfolio:(str,)) -> iter:
+        """Yield models found by the solver, with given options"""
+        return asp.solve_motif_search(step, lowerbound, upperbound, files=files, graph=''.join(atoms) + other_atoms,
+                                      options=options, budget=self._budget, portfolio=portfolio)
+
+    def _timed_models(self, models:iter, history:object, options:str, nb_edge:int) -> iter:
+        """Yield given models, and record the time needed to get them all.
+
+        Searches that did not run to their end are not recorded: those closed
+        early because no other motif can be used, and those cancelled or stopped
+        by their time budget, since their times say nothing of the options.
+
+        """
+        start = get_time()
+        yield from models  # not reached after when closed early
+        if not (self._budget and (self._budget.cancelled or self._budget.exhausted)):
+            history.record(options, get_time() - start, nb_edge)
+
+    def _portfolio(self) -> (str,):
+        """Clingo options of the configurations to race for a search"""
+        return CLINGO_PORTFOLIO.get(self.name, CLINGO_PORTFOLIO[None])
+
 
 class BicliqueSearcher(MotifSearcher):
     """Searcher for Bicliques, including stars."""
@@ -154,48 +281,38 @@ class BicliqueSearcher(MotifSearcher):
         Maximal lowerbound is the score of biggest star, or the score of the biggest intersection.
         Minimal upperbound is the maximal possible association of the most connected nodes
         """
-        neis = {node: frozenset(neighbors) for node, neighbors in graph.neighbors()}
-        sorted_degrees = sorted(tuple(map(len, neis.values())), reverse=True)
-        try:
-            upperbound = max(idx * deg for idx, deg in enumerate(sorted_degrees, start=1) if deg > 1)
-        except ValueError:
-            upperbound = math.inf
-        upperbound = min(upperbound, graph.nb_edge)
-        biggest_star = max(len(neighbors) for neighbors in neis.values())
+        upperbound = min(degrees_upperbound(graph.degrees), graph.nb_edge)
+        biggest_star = int(graph.degrees.max())
         if BICLIQUE_LOWERBOUND_MAXNEI <= 1:
             lowerbound = biggest_star
         elif BICLIQUE_LOWERBOUND_MAXNEI == 2:
-            maxnei2 = max(len(neis[a] & neis[b]) * 2 for a, b in itertools.combinations(neis.keys(), r=2))
+            maxnei2 = graph.max_common_neighbors() * 2
             lowerbound = max(maxnei2, biggest_star)
         elif BICLIQUE_LOWERBOUND_MAXNEI >= 3:
-            lowerbound = 0
-            for level in range(2, BICLIQUE_LOWERBOUND_MAXNEI + 1):
-                try:
-                    max_for_level = max(len(frozenset.intersection(*(neis[s] for s in sets))) * level for sets in itertools.combinations(neis.keys(), r=level))
-                except ValueError:
-                    max_for_level = 0
-                if max_for_level < lowerbound: break
-                if lowerbound < biggest_star: break
-                lowerbound = max(lowerbound, max_for_level)
+            lowerbound = max(graph.greedy_biclique_score(BICLIQUE_LOWERBOUND_MAXNEI), biggest_star)
         else:
-            maxnei2 = max(len(neis[a] & neis[b]) * 2 for a, b in itertools.combinations(neis.keys(), r=2))
+            maxnei2 = graph.max_common_neighbors() * 2
             lowerbound = max(maxnei2, biggest_star)
         return lowerbound, upperbound
 
+    def compute_new_lowerbound(self, graph:Graph, motif:Motif) -> int:
+        """Score of the biggest star or biclique between two nodes made of
+        nodes in no powernode, that the block constraint can't forbid"""
+        return max(2, graph.index.max_free_degree(), graph.index.max_shared() * 2)
+    def compute_new_upperbound(self, graph:Graph) -> int:
+        return min(degrees_upperbound(graph.degrees), graph.nb_edge)
+
 
     def _search(self, step:int, graph:Graph, lowerbound:int, upperbound:int, other_atoms:str='') -> iter:
-        graph = ''.join(graph.as_asp(step, filter_for_bicliques=True, lowerbound=lowerbound, upperbound=upperbound))
+        atoms = tuple(graph.as_asp(step, filter_for_bicliques=True, lowerbound=lowerbound, upperbound=upperbound))
         if SHOW_DEBUG:
-            print('MXDKJX: GRAPH:', graph + '\n' + other_atoms)
-        yield from asp.solve_motif_search(step, lowerbound, upperbound,
-                                          options=self._clingo_options(),
-                                          files=FULLBICLIQUE_ASP_FILES,
-                                          graph=graph + other_atoms)
+            print('MXDKJX: GRAPH:', ''.join(atoms) + '\n' + other_atoms)
+        yield from self._solve(step, lowerbound, upperbound, FULLBICLIQUE_ASP_FILES, atoms, other_atoms)
 
     def covered_edges(self, sets:[frozenset]) -> iter:
         """Return the edges that are covered by given sets"""
         assert len(sets) == 2
-        yield from map(frozenset, itertools.product(*sets))
+        yield from itertools.product(*sets)
 
 
 class NonStarBicliqueSearcher(MotifSearcher):
@@ -214,45 +331,30 @@ class NonStarBicliqueSearcher(MotifSearcher):
         Maximal lowerbound is the score of the biggest intersection.
         Minimal upperbound is the maximal possible association of the most connected nodes
         """
-        neis = {node: frozenset(neighbors) for node, neighbors in graph.neighbors()}
-        sorted_degrees = sorted(tuple(map(len, neis.values())), reverse=True)
-        try:
-            upperbound = max(idx * deg for idx, deg in enumerate(sorted_degrees, start=1) if deg > 1)
-        except ValueError:
-            upperbound = math.inf
-        upperbound = min(upperbound, graph.nb_edge)
+        upperbound = min(degrees_upperbound(graph.degrees), graph.nb_edge)
         if BICLIQUE_LOWERBOUND_MAXNEI >= 3:
-            maxnei = 0
-            for level in range(2, BICLIQUE_LOWERBOUND_MAXNEI + 1):
-                try:
-                    max_for_level = max(len(frozenset.intersection(*(neis[s] for s in sets))) * level for sets in itertools.combinations(neis.keys(), r=level))
-                except ValueError:
-                    max_for_level = 0
-                if max_for_level < maxnei: break
-                maxnei = max_for_level
+            maxnei = graph.greedy_biclique_score(BICLIQUE_LOWERBOUND_MAXNEI)
         else:
-            try:
-                maxnei = max(len(neis[a] & neis[b]) * 2 for a, b in itertools.combinations(neis.keys(), r=2))
-            except ValueError:
-                maxnei = 0
+            maxnei = graph.max_common_neighbors() * 2
         return maxnei, upperbound
 
     def compute_new_lowerbound(self, graph:Graph, motif:Motif) -> int:
-        return 4  # At least 2 elements in each set
+        """Score of the biggest biclique between two nodes made of nodes
+        in no powernode, or 4 since there is at least 2 elements in each set"""
+        return max(4, graph.index.max_shared() * 2)
+    def compute_new_upperbound(self, graph:Graph) -> int:
+        return min(degrees_upperbound(graph.degrees), graph.nb_edge)
 
     def _search(self, step:int, graph:Graph, lowerbound:int, upperbound:int, other_atoms:str='') -> iter:
-        graph = ''.join(graph.as_asp(step, filter_for_bicliques=True, lowerbound=lowerbound, upperbound=upperbound))
+        atoms = tuple(graph.as_asp(step, filter_for_bicliques=True, lowerbound=lowerbound, upperbound=upperbound))
         if SHOW_DEBUG:
-            print('UHJGMR: GRAPH:', graph + '\n' + other_atoms)
-        yield from asp.solve_motif_search(step, lowerbound, upperbound,
-                                          options=self._clingo_options(),
-                                          files=BICLIQUE_ASP_FILES,
-                                          graph=graph + other_atoms)
+            print('UHJGMR: GRAPH:', ''.join(atoms) + '\n' + other_atoms)
+        yield from self._solve(step, lowerbound, upperbound, BICLIQUE_ASP_FILES, atoms, other_atoms)
 
     def covered_edges(self, sets:[frozenset]) -> iter:
         """Return the edges that are covered by given sets"""
         assert len(sets) == 2
-        yield from map(frozenset, itertools.product(*sets))
+        yield from itertools.product(*sets)
 
 
 class StarSearcher(MotifSearcher):
@@ -262,7 +364,7 @@ class StarSearcher(MotifSearcher):
     motif_name = 'biclique'
 
     def __init__(self, graph:Graph):
-        self.__star_size = max(len(neighbors) for _, neighbors in graph.neighbors())
+        self.__star_size = int(graph.degrees.max())
         super().__init__(graph)
 
 
@@ -270,21 +372,23 @@ class StarSearcher(MotifSearcher):
         return self.__star_size
     def compute_initial_upperbound(self, graph:Graph) -> int:
         return self.__star_size
+    def compute_new_lowerbound(self, graph:Graph, motif:Motif) -> int:
+        """Size of the biggest star having only leaves in no powernode"""
+        return max(2, graph.index.max_free_degree())
+    def compute_new_upperbound(self, graph:Graph) -> int:
+        return int(graph.degrees.max())
 
     def _search(self, step:int, graph:Graph, lowerbound:int, upperbound:int, other_atoms:str='') -> iter:
-        graph = ''.join(graph.as_asp(step, filter_for_stars=True, lowerbound=lowerbound, upperbound=upperbound))
+        atoms = tuple(graph.as_asp(step, filter_for_stars=True, lowerbound=lowerbound, upperbound=upperbound))
         if SHOW_DEBUG:
-            print('ABQSSN: GRAPH:', graph + '\n' + other_atoms)
-        yield from asp.solve_motif_search(step, lowerbound, upperbound,
-                                          options=self._clingo_options(),
-                                          files=STAR_ASP_FILES,
-                                          graph=graph + other_atoms)
+            print('ABQSSN: GRAPH:', ''.join(atoms) + '\n' + other_atoms)
+        yield from self._solve(step, lowerbound, upperbound, STAR_ASP_FILES, atoms, other_atoms)
 
     def covered_edges(self, sets:[frozenset]) -> iter:
         """Return the edges that are covered by given sets"""
         assert any(len(set) == 1 for set in sets)
         assert len(sets) == 2
-        yield from map(frozenset, itertools.product(*sets))
+        yield from itertools.product(*sets)
 
 
 class CliqueSearcher(MotifSearcher):
@@ -299,39 +403,32 @@ class CliqueSearcher(MotifSearcher):
         If any node with clustering coefficient equals to 1 exists,
         the number of neighbors gives a lowerbound.
 
-        Use utils.maximal_clique_size function on all nodes of graph to
-        compute the biggest clique possible theoretically.
+        The upperbound is given by the core numbers
+        and triangles of nodes (see clique_upperbound).
 
         """
-        node_to_edge = lambda n: (n * (n - 1)) // 2
-        min_clique_size, max_clique_size = 0, 0
-        for node, neighbors, nb_edge in graph.neighbors(increasing_degree=True, nb_edges_between_neighbors=True):
-            node_clique_size = utils.maximal_clique_size(nb_edge)
-            max_clique_size = max(max_clique_size, node_clique_size)
-            if nb_edge == node_to_edge(len(neighbors)):  # clustering coefficient is 1
-                min_clique_size = max(min_clique_size, len(neighbors))
-            # if clique_size > len(neighbors):  # TODO: test and prove useful that optimization
-                # break  # we can't found better since it's sorted
-        return max(3, node_to_edge(min_clique_size)), node_to_edge(max_clique_size)
+        degrees = graph.degrees.astype(numpy.int64)
+        complete = graph.index.triangles == (degrees * (degrees - 1)) // 2  # clustering coefficient is 1
+        min_clique_size = int(degrees[complete].max(initial=0))
+        return max(3, (min_clique_size * (min_clique_size - 1)) // 2), self.compute_new_upperbound(graph)
 
     def compute_new_lowerbound(self, graph:Graph, motif:Motif) -> int:
         return 3  # At least 3 elements in a clique
+    def compute_new_upperbound(self, graph:Graph) -> int:
+        return clique_upperbound(graph.core_numbers(), graph.index.triangles)
 
 
     def _search(self, step:int, graph:Graph, lowerbound:int, upperbound:int, other_atoms:str='') -> iter:
-        graph = ''.join(graph.as_asp(step, filter_for_cliques=True, lowerbound=lowerbound, upperbound=upperbound))
+        atoms = tuple(graph.as_asp(step, filter_for_cliques=True, lowerbound=lowerbound, upperbound=upperbound))
         if SHOW_DEBUG:
-            print('OKAPOD: GRAPH:', graph + '\n' + other_atoms)
-        yield from asp.solve_motif_search(step, lowerbound, upperbound,
-                                          options=self._clingo_options(),
-                                          files=CLIQUE_ASP_FILES,
-                                          graph=graph + other_atoms)
+            print('OKAPOD: GRAPH:', ''.join(atoms) + '\n' + other_atoms)
+        yield from self._solve(step, lowerbound, upperbound, CLIQUE_ASP_FILES, atoms, other_atoms)
 
     def covered_edges(self, sets:[frozenset]) -> iter:
         """Return the edges that are covered by given sets"""
         assert len(sets) == 1
         nodes = frozenset(next(iter(sets)))
-        yield from map(frozenset, itertools.combinations(nodes, r=2))
+        yield from itertools.combinations(nodes, r=2)
 
 
 class QuasiBicliqueSearcher(MotifSearcher):
@@ -349,43 +446,27 @@ class QuasiBicliqueSearcher(MotifSearcher):
         Maximal lowerbound is the score of the biggest intersection.
         Minimal upperbound is the maximal possible association of the most connected nodes
         """
-        neis = {node: frozenset(neighbors) for node, neighbors in graph.neighbors()}
-        sorted_degrees = sorted(tuple(map(len, neis.values())), reverse=True)
-        try:
-            upperbound = max(idx * deg for idx, deg in enumerate(sorted_degrees, start=1) if deg > 1)
-        except ValueError:
-            upperbound = math.inf
-        upperbound = min(upperbound, graph.nb_edge)
+        upperbound = min(degrees_upperbound(graph.degrees), graph.nb_edge)
         if BICLIQUE_LOWERBOUND_MAXNEI >= 3:
-            maxnei = 0
-            for level in range(2, BICLIQUE_LOWERBOUND_MAXNEI + 1):
-                try:
-                    max_for_level = max(len(frozenset.intersection(*(neis[s] for s in sets))) * level for sets in itertools.combinations(neis.keys(), r=level))
-                except ValueError:
-                    max_for_level = 0
-                if max_for_level < maxnei: break
-                maxnei = max_for_level
+            maxnei = graph.greedy_biclique_score(BICLIQUE_LOWERBOUND_MAXNEI)
         else:
-            try:
-                maxnei = max(len(neis[a] & neis[b]) * 2 for a, b in itertools.combinations(neis.keys(), r=2))
-            except ValueError:
-                maxnei = 0
+            maxnei = graph.max_common_neighbors() * 2
         return maxnei, upperbound
 
+    def compute_new_upperbound(self, graph:Graph) -> int:
+        return min(degrees_upperbound(graph.degrees), graph.nb_edge)
+
 
     def _search(self, step:int, graph:Graph, lowerbound:int, upperbound:int, other_atoms:str='') -> iter:
-        graph = ''.join(graph.as_asp(step, lowerbound=lowerbound, upperbound=upperbound))
+        atoms = tuple(graph.as_asp(step, lowerbound=lowerbound, upperbound=upperbound))
         if SHOW_DEBUG:
-            print('LYOTVG: GRAPH:', graph + '\n' + other_atoms)
-        yield from asp.solve_motif_search(step, lowerbound, upperbound,
-                                          options=self._clingo_options() + f' -c mu={QUASIBICLIQUE_MU} -t 4',
-                                          files=QUASIBICLIQUE_ASP_FILES,
-                                          graph=graph + other_atoms)
+            print('LYOTVG: GRAPH:', ''.join(atoms) + '\n' + other_atoms)
+        yield from self._solve(step, lowerbound, upperbound, QUASIBICLIQUE_ASP_FILES, atoms, other_atoms, options=f' -c mu={QUASIBICLIQUE_MU} -t 4')
 
     def covered_edges(self, sets:[frozenset]) -> iter:
         """Return the edges that are covered by given sets"""
         assert len(sets) == 2
-        yield from map(frozenset, itertools.product(*sets))
+        yield from itertools.product(*sets)
 
 
 class TripletSearcher(MotifSearcher):
@@ -401,8 +482,6 @@ class TripletSearcher(MotifSearcher):
         Maximal lowerbound is the score of the biggest intersection.
         Minimal upperbound is the maximal possible association of the most connected nodes
         """
-        neis = {node: frozenset(neighbors) for node, neighbors in graph.neighbors()}
-        sorted_degrees = sorted(tuple(map(len, neis.values())), reverse=True)
         try:
             # upperbound = max(idx * deg for idx, deg in enumerate(sorted_degrees, start=1) if deg > 1)
             upperbound = math.inf
@@ -410,30 +489,17 @@ class TripletSearcher(MotifSearcher):
             upperbound = math.inf
         upperbound = min(upperbound, graph.nb_edge)
         if BICLIQUE_LOWERBOUND_MAXNEI >= 3:
-            maxnei = 0
-            for level in range(2, BICLIQUE_LOWERBOUND_MAXNEI + 1):
-                try:
-                    max_for_level = max(len(frozenset.intersection(*(neis[s] for s in sets))) * level for sets in itertools.combinations(neis.keys(), r=level))
-                except ValueError:
-                    max_for_level = 0
-                if max_for_level < maxnei: break
-                maxnei = max_for_level
+            maxnei = graph.greedy_biclique_score(BICLIQUE_LOWERBOUND_MAXNEI)
         else:
-            try:
-                maxnei = max(len(neis[a] & neis[b]) * 2 for a, b in itertools.combinations(neis.keys(), r=2))
-            except ValueError:
-                maxnei = 0
+            maxnei = graph.max_common_neighbors() * 2
         return maxnei, upperbound
 
 
     def _search(self, step:int, graph:Graph, lowerbound:int, upperbound:int, other_atoms:str='') -> iter:
-        graph = ''.join(graph.as_asp(step, filter_for_bicliques=True, lowerbound=lowerbound, upperbound=upperbound))
+        atoms = tuple(graph.as_asp(step, filter_for_bicliques=True, lowerbound=lowerbound, upperbound=upperbound))
         if SHOW_DEBUG:
-            print('BLELÉP: GRAPH:', graph + '\n' + other_atoms)
-        yield from asp.solve_motif_search(step, lowerbound, upperbound,
-                                          options=self._clingo_options() + f' -c mu={QUASIBICLIQUE_MU} -t 4',
-                                          files=TRIPLET_ASP_FILES,
-                                          graph=graph + other_atoms)
+            print('BLELÉP: GRAPH:', ''.join(atoms) + '\n' + other_atoms)
+        yield from self._solve(step, lowerbound, upperbound, TRIPLET_ASP_FILES, atoms, other_atoms, options=f' -c mu={QUASIBICLIQUE_MU} -t 4')
 
     def covered_edges(self, sets:[frozenset]) -> iter:
         """Return the edges that are covered by given sets"""
@@ -441,10 +507,10 @@ class TripletSearcher(MotifSearcher):
         assert len(sets) == 3
         a, b, c = sets
         print('SETS:', a, b, c)
-        yield from map(frozenset, itertools.product(a, b))
-        yield from map(frozenset, itertools.product(a, c))
-        yield from map(frozenset, itertools.product(b, c))
-        yield from map(frozenset, itertools.combinations(c, r=2))
+        yield from itertools.product(a, b)
+        yield from itertools.product(a, c)
+        yield from itertools.product(b, c)
+        yield from itertools.combinations(c, r=2)
 
 
 
@@ -0,0 +1,109 @@
+"""Extraction of the connected components of graphs too big to be held in memory.
+
+Edges are read by chunks. Node names are interned as integers,
+and grouped in connected components by a union-find,
+while the edges are spilled on disk as pairs of integers.
+The spilled edges are then sorted by connected component, one chunk at a time,
+and the sorted runs are merged, so that the connected components are
+yielded one after the other.
+Only the node table, a chunk of edges and the yielded connected component
+are held in memory.
+
+"""
+
+import os
+import heapq
+import tempfile
+import itertools
+import numpy
+
+
+class NodeTable:
+    """Node names interned as integers, in order of appearance,
+    and grouped in connected components by a union-find.
+
+    >>> table = NodeTable()
+    >>> table.union('a', 'b'), table.union('c', 'd'), table.union('d', 'b')
+    ((0, 1), (2, 3), (1, 3))
+    >>> table.roots(), table.names
+    ([0, 0, 0, 0], ['a', 'b', 'c', 'd'])
+
+    """
+
+    def __init__(self):
+        self.names = []  # node id -> node name
+        self._ids = {}  # node name -> node id
+        self._parent = []  # node id -> node id of the same cc, itself for the root
+
+    def intern(self, name:str or int) -> int:
+        """Return the id of given node name, created if needed"""
+        node = self._ids.get(name)
+        if node is None:
+            node = self._ids[name] = len(self.names)
+            self.names.append(name)
+            self._parent.append(node)
+        return node
+
+    def find(self, node:int) -> int:
+        """Return the root of the cc of given node, i.e. its first appeared node"""
+        parent = self._parent
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]  # path halving
+            node = parent[node]
+        return node
+
+    def union(self, source:str or int, target:str or int) -> (int, int):
+        """Put given nodes in the same cc, and return their ids, smallest first"""
+        source, target = sorted((self.intern(source), self.intern(target)))
+        root_source, root_target = self.find(source), self.find(target)
+        if root_source != root_target:
+            self._parent[max(root_source, root_target)] = min(root_source, root_target)
+        return source, target
+
+    def roots(self) -> [int]:
+        """Return the list node id -> root of its cc"""
+        return [self.find(node) for node in range(len(self.names))]
+
+
+def connected_components(edges:iter, chunk_size:int, workdir:str=None) -> iter:
+    """Yield the edges of each connected component of given edges,
+    in order of appearance, each edge being given once.
+    A self loop stands for its node.
+
+    chunk_size -- number of edges held in memory at once
+    workdir -- directory of the spill files, default to the system's one
+
+    >>> list(connected_components([(1, 2), ('a', 'b'), (2, 1), (2, 5), (6, 6)], chunk_size=2))
+    [[(1, 2), (2, 5)], [('a', 'b')], [(6, 6)]]
+
+    """
+    edges, table = iter(edges), NodeTable()
+    with tempfile.TemporaryDirectory(prefix='powergrasp-', dir=workdir) as workdir:
+        spill = os.path.join(workdir, 'edges')
+        with open(spill, 'wb') as fd:
+            for chunk in iter(lambda: tuple(itertools.islice(edges, chunk_size)), ()):
+                numpy.array([table.union(*edge) for edge in chunk], dtype=numpy.int64).tofile(fd)
+        if not table.names:
+            return  # no edge, and numpy can't map an empty file
+        roots = numpy.array(table.roots(), dtype=numpy.int64)
+        # sort each chunk by cc, then edge
+        pairs = numpy.memmap(spill, dtype=numpy.int64, mode='r').reshape(-1, 2)
+        runs = []
+        for start in range(0, len(pairs), chunk_size):
+            chunk = numpy.asarray(pairs[start:start+chunk_size])
+            run = os.path.join(workdir, 'run-{}'.format(len(runs)))
+            numpy.unique(numpy.column_stack((roots[chunk[:, 0]], chunk)), axis=0).tofile(run)
+            runs.append(run)
+        del pairs
+        # merge the runs, each cc being yielded once complete
+        merged = heapq.merge(*map(_run_reader, runs))
+        for _, triplets in itertools.groupby(merged, key=lambda triplet: triplet[0]):
+            yield [(table.names[source], table.names[target])
+                   for (_, source, target), _ in itertools.groupby(triplets)]  # duplicated edges are consecutive
+
+
+def _run_reader(fname:str, block_size:int=4096) -> iter:
+    """Yield the (root, source, target) found in given run file"""
+    triplets = numpy.memmap(fname, dtype=numpy.int64, mode='r').reshape(-1, 3)
+    for start in range(0, len(triplets), block_size):
+        yield from map(tuple, triplets[start:start+block_size].tolist())
@@ -0,0 +1,49 @@
+"""Test of the choice of clingo options according to the previous searches.
+
+"""
+
+import pytest
+from powergrasp import asp, searchers
+from powergrasp.adaptive import SolveHistory
+from powergrasp.searchers import MotifSearcher
+
+
+def timed_search(monkeypatch, history:SolveHistory, options:str, nb_edge:int, budget:asp.TimeBudget=None,
+                 nb_consumed:int=None, time:float=1.):
+    """Consume nb_consumed of the 3 models (all if None) of a search
+    taking given time, made with given options on a graph of given number of edges"""
+    searcher = MotifSearcher.__new__(MotifSearcher)  # no graph needed
+    searcher._budget = budget
+    clock = iter((0., time))
+    monkeypatch.setattr(searchers, 'get_time', lambda: next(clock))
+    models = searcher._timed_models(iter(range(3)), history, options, nb_edge)
+    if nb_consumed is None:
+        tuple(models)
+    else:
+        for _ in range(nb_consumed):
+            next(models)
+        models.close()  # as done by the motif selection
+
+
+def test_later_candidate_timed_on_smaller_graph(monkeypatch):
+    history = SolveHistory(['first', 'later'])
+    timed_search(monkeypatch, history, history.choose(), nb_edge=1000, time=10.)  # whole cc
+    timed_search(monkeypatch, history, history.choose(), nb_edge=100, time=2.)  # faster, on what remains
+    assert history.choose() == 'first'
+
+
+@pytest.mark.parametrize('budget, nb_consumed', [
+    (None, 1),  # closed early by the motif selection
+    (asp.TimeBudget(1), None),  # stopped by the time budget
+    (asp.TimeBudget(cancel_when=lambda: True), None),  # cancelled
+])
+def test_unfinished_searches_are_not_recorded(budget, nb_consumed, monkeypatch):
+    history = SolveHistory(['first', 'later'])
+    if budget:
+        budget.exhausted = budget.seconds is not None
+        budget.cancelled = budget.cancel_when is not None
+    timed_search(monkeypatch, history, 'first', nb_edge=10, budget=budget, nb_consumed=nb_consumed)
+    assert history.choose() == 'first', "an unfinished search was recorded"
+    timed_search(monkeypatch, history, 'first', nb_edge=10)
+    assert history.choose() == 'later'
+    assert history.mean_time('first') == 0.1
@@ -0,0 +1,17 @@
+"""Test of the compression of graphs converted in binary format.
+
+"""
+
+import pytest
+from powergrasp import binary
+from powergrasp.graph import adjacencies_from_file
+from powergrasp.routines import compress_by_cc
+from .definitions import unified_bubble
+
+
+@pytest.mark.parametrize('fname', ['concomp.lp', 'quoting.lp', 'single-node.lp', 'empty.lp'])
+def test_binary_format(fname, tmpdir):
+    converted = str(tmpdir.join('graph.pgb'))
+    binary.write(converted, adjacencies_from_file('data/' + fname))
+    assert binary.is_binary_file(converted)
+    assert unified_bubble(compress_by_cc(converted)) == unified_bubble(compress_by_cc('data/' + fname))
@@ -0,0 +1,32 @@
+"""Test of the resuming of compressions from their checkpoints.
+
+"""
+
+import pytest
+from powergrasp import constants, routines
+from powergrasp.adaptive import SolveHistory
+from powergrasp.routines import compress_by_cc
+from .definitions import unified_bubble
+
+
+@pytest.mark.parametrize('fname, recipe', [('zorro.lp', None), ('recipe-test.lp', 'data/recipe-test.txt')])
+@pytest.mark.parametrize('interrupted_step', [1, 3, 5])
+def test_resume_after_interruption(fname, recipe, interrupted_step, tmpdir, monkeypatch):
+    # options chosen on solving times differ from one run to another,
+    #  and may lead to another motif among the equally scored ones
+    monkeypatch.setattr(SolveHistory, 'choose', lambda history: history.candidates[0])
+    expected = unified_bubble(compress_by_cc('data/' + fname, recipe))
+    monkeypatch.setattr(constants, 'CHECKPOINT_DIR', str(tmpdir))
+    monkeypatch.setattr(constants, 'CHECKPOINT_STEPS', 1)
+    search_best_motifs = routines.search_best_motifs
+    def interrupted_search(searchers, step, recipe):
+        if step >= interrupted_step:
+            raise KeyboardInterrupt()
+        return search_best_motifs(searchers, step, recipe)
+    monkeypatch.setattr(routines, 'search_best_motifs', interrupted_search)
+    tuple(compress_by_cc('data/' + fname, recipe))
+    monkeypatch.setattr(routines, 'search_best_motifs', search_best_motifs)
+    assert unified_bubble(compress_by_cc('data/' + fname, recipe, resume=True)) == expected
+    # a finished compression is resumed as is
+    monkeypatch.setattr(routines, 'search_best_motifs', interrupted_search)
+    assert unified_bubble(compress_by_cc('data/' + fname, recipe, resume=True)) == expected
@@ -0,0 +1,59 @@
+"""Test of the race between the clingo configurations of a portfolio.
+
+"""
+
+import sys
+import time
+import subprocess
+import pytest
+from powergrasp import asp
+
+
+FAILING = [sys.executable, '-c', 'import sys; sys.stderr.write("invalid option"); sys.exit(65)']
+SLOW = [sys.executable, '-c', 'import time; time.sleep(60)']
+
+
+@pytest.mark.parametrize('budget', [None, asp.TimeBudget(60)])
+def test_failing_racer(budget, monkeypatch):
+    monkeypatch.setattr(asp, '_clingo_command', lambda files, constants, options, budget=None: FAILING if options == 'failing' else SLOW)
+    procs, popen = [], subprocess.Popen
+    def recorded_popen(*args, **kwargs):
+        procs.append(popen(*args, **kwargs))
+        return procs[-1]
+    monkeypatch.setattr(subprocess, 'Popen', recorded_popen)
+    start = time.time()
+    with pytest.raises(RuntimeError, match='code 65: invalid option'):
+        tuple(asp._race_in_subprocess((), '', {}, ('slow', 'failing'), budget))
+    assert time.time() - start < 30, "the slow racer was waited"
+    assert all(proc.poll() is not None for proc in procs), "racers are still running"
+    assert budget is None or not budget.exhausted
+
+
+PIGEONHOLES = 'p(1..12). h(1..11). 1 { in(P,H): h(H) } 1 :- p(P). :- in(P,H) ; in(Q,H) ; P<Q.'
+
+
+def test_racers_closed_when_budget_exhausted(monkeypatch):
+    import clingo
+    handles = []
+    class RecordedHandle:
+        def __init__(self, handle):
+            self.handle, self.closed = handle, False
+            handles.append(self)
+        def wait(self, *args):  return self.handle.wait(*args)
+        def cancel(self):  self.handle.cancel()
+        def __enter__(self):  return self
+        def __exit__(self, *args):
+            self.handle.__exit__(*args)
+            self.closed = True
+    class RecordedControl:
+        def __init__(self, options):
+            self.control = clingo.Control(options.split())
+            self.control.add('base', [], PIGEONHOLES)
+            self.control.ground([('base', [])])
+        def solve(self, **kwargs):
+            return RecordedHandle(self.control.solve(**kwargs))
+    monkeypatch.setattr(asp, '_grounded_control', lambda files, graph, constants, options: RecordedControl(options))
+    budget = asp.TimeBudget(0.2)
+    assert tuple(asp._race_in_process((), '', {}, ('--configuration=trendy', '--configuration=crafty'), budget)) == ()
+    assert budget.exhausted
+    assert len(handles) == 2 and all(handle.closed for handle in handles), "solve handles are left open"